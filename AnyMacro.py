@@ -27,17 +27,22 @@
 import adsk.core, adsk.fusion, adsk.cam
 
 from collections import deque
+from contextlib import contextmanager
 import os.path as path
+import os, re, sys, json, time, zlib, heapq, threading
+IMPORT_START = time.perf_counter()
 
+FILE_DIR = path.dirname(path.realpath(__file__))
+# Development checkouts reload the AddinLib modules on every start so edits are picked up without restarting Fusion.
+DEVELOPMENT_MODE = path.exists(path.join(FILE_DIR, '.git')) or os.environ.get('ANYMACRO_DEV') == '1'
 
 # Import relative path to avoid namespace pollution
-from .AddinLib import utils, events, manifest, error, settings, geometry, AppObjects
-utils.ReImport_List(AppObjects, events, manifest, error, settings, geometry, utils)
+from .AddinLib import utils, events, manifest, error, settings, AppObjects
+if DEVELOPMENT_MODE: utils.ReImport_List(AppObjects, events, manifest, error, settings, utils)
 
 
 NAME = 'AnyMacro'
 VERSION = manifest.getVersion()
-FILE_DIR = path.dirname(path.realpath(__file__))
 VERSION_INFO = f'({NAME} v {VERSION})'
 CMD_DESCRIPTION = 'Enables or disables the tracking of commands to create a macro.'
 COMMAND_DATA = f'{CMD_DESCRIPTION}\n\n{VERSION_INFO}\n'
@@ -51,29 +56,69 @@ CONSECUTIVE_TOGGLE_ID = 'zxynine_anyMacroBlockConsecutive'
 BUILD_MACRO_CMD_DEF_ID = 'zxynine_anyMacroBuildMacro'
 CLEAR_RECORD_CMD_ID = 'zxynine_anyMacroClearRecord'
 HALT_CMD_ID = 'zxynine_anyMacroHaltFire'
+DIAGNOSTICS_DROPDOWN_ID = 'zxynine_anyMacroDiagnosticsDropdown'
+REPLAY_TIMING_TOGGLE_ID = 'zxynine_anyMacroReplayTiming'
+EXPORT_TIMINGS_CMD_ID = 'zxynine_anyMacroExportTimings'
+MEMORY_REPORT_CMD_ID = 'zxynine_anyMacroMemoryReport'
+PROFILE_HANDLERS_TOGGLE_ID = 'zxynine_anyMacroProfileHandlers'
+EXPORT_HANDLER_STATS_CMD_ID = 'zxynine_anyMacroExportHandlerStats'
 ADD_MACRO_CUSTOM_ID = 'AnyMacro_Add_Macro'
+ADD_MACRO_RESULT_ID = 'AnyMacro_Add_Macro_Result' #Fired with a JSON summary after every import through the custom event
+IMPORT_MACROS_CMD_ID = 'zxynine_anyMacroImportMacros'
+SEARCH_MACROS_CMD_ID = 'zxynine_anyMacroSearchMacros'
+REPLAY_WATCHDOG_EVENT_ID = 'AnyMacro_Replay_Watchdog'
+SAVE_COMPLETE_EVENT_ID = 'AnyMacro_Save_Complete' #Fired by the save writer thread so its results are applied on the UI thread
 
 app_:adsk.core.Application = None
 ui_:adsk.core.UserInterface = None
 error_catcher_ = error.ErrorCatcher()
-events_manager_ = events.EventsManager(error_catcher_)
+events_manager_:'HandlerProfiler' = None #Wraps AddinLib's events manager, created with the profiler below
 add_macro_event:adsk.core.CustomEvent=None
 #|||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
 #Commands/Settings
 
-MAX_TRACK = 10
+MAX_TRACK = 200 #The recorder keeps this many of the most recent commands
+MACRO_PAGE_SIZE = 25 #Libraries larger than this are split into sub-dropdowns
+LAZY_CONTROLS_THRESHOLD = 50 #Libraries larger than this only add a page's controls when it is first opened
 MACRO_DATA_PATH = path.join(FILE_DIR,'macros')
 MACRO_FILE_DATA_PATH = path.join(MACRO_DATA_PATH, 'SavedMacros.json')
-
-allMacros = []
+MACRO_JOURNAL_PATH = path.join(MACRO_DATA_PATH, 'SavedMacros.journal')
+MACRO_INDEX_PATH = path.join(MACRO_DATA_PATH, 'MacroIndex.json') #Names, ids and file offsets of every saved macro, read at startup
+MACRO_SHARD_PREFIX = 'Category_' #Macros with a category are saved to macros/Category_<category>.json, the rest to SavedMacros.json
+DEFINITION_CACHE_PATH = path.join(MACRO_DATA_PATH, 'DefinitionCache.json') #Content hashes of the command definitions left in Fusion by the last stop
+JOURNAL_COMPACT_SIZE = 64*1024 #Bytes of journal after which it is folded back into the save file
+SAVE_FLUSH_TIMEOUT = 5.0 #Seconds stop() waits for the save writer before giving up
+REPLAY_TIMINGS_PATH = path.join(FILE_DIR, 'ReplayTimings.json')
+MEMORY_REPORT_PATH = path.join(FILE_DIR, 'MemoryReport.json')
+HANDLER_STATS_PATH = path.join(FILE_DIR, 'HandlerStats.json')
+VALIDATION_REPORT_PATH = path.join(FILE_DIR, 'ValidationReport.json') #Macros using commands that do not exist, rewritten after every validation sweep
+BROKEN_MACRO_SUFFIX = ' (missing commands)' #Appended to the dropdown of a macro that uses commands that do not exist
+TIMING_SAMPLE_COUNT = 256 #Most recent samples kept for each macro and command id
+REPLAY_STEP_TIMEOUT = 15.0 #Seconds a replay waits for its next command to start before it is cancelled (0 disables)
+REPLAY_UNRELATED_LIMIT = 25 #Other commands that may start while a replay waits before it is cancelled (0 disables)
+WATCHDOG_INTERVAL = 1.0
+REPLAY_QUEUE_POLICY = 'fifo' #A macro started while another runs is queued ('fifo'), ignored ('drop') or stops the running one ('preempt')
+REPLAY_QUEUE_LIMIT = 20 #Runs waiting behind the current one, later ones are dropped
+HALT_FLUSHES_QUEUE = False #Stop current Macro also cancels the queued runs instead of starting the next one
+
+# Macro compiler, applied to every execute list before it is replayed
+NOOP_COMMANDS = frozenset(('CommitCommand','SelectCommand')) #Dropped from replays, they do nothing on their own
+SEARCH_RESULT_LIMIT = 25 #Results listed by the search palette
+SEARCH_NAME_WEIGHT = 3 #Matches in a macro's name rank above matches in its command ids
+CAMERA_COMMAND_IDS = frozenset(('zxynine_anymacro_BuiltinAlignView','zxynine_anymacro_BuiltinChangeView','zxynine_anymacro_BuiltinChangeViewOrientation'))
+MERGE_CAMERA_STEPS = True #Consecutive camera builtins in a macro redraw the viewport once
+TEST_MACRO_ID = 'zxynine_anyMacroTestMacro' #Reserved so the recorder's test macro never overwrites a saved macro
 
 #|||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
 #Simple functions
 def exists(obj):return obj is not None
+def log(message:str):
+	try: app_.log(f'{NAME}: {message}')
+	except: pass #Older versions of Fusion have no text command log
 def getDelete(collection:adsk.core.CommandDefinitions,objId): utils.ifDelete(collection.itemById(objId))
 def deleteAll(*objs): return all(map(utils.ifDelete,objs))
 
-def UpdateButton(cmdDef: adsk.core.CommandDefinition,Title,Icon): cmdDef.resourceFolder = Icon; cmdDef.controlDefinition.name = Title
+def UpdateButton(cmdDef: adsk.core.CommandDefinition,Title,Icon): cmdDef.resourceFolder = Icon; cmdDef.controlDefinition.name = Title; definition_cache_.changed(cmdDef.id, Title, Icon)
 def FullPromote(cmdCtrl:adsk.core.CommandControl): cmdCtrl.isPromoted=cmdCtrl.isPromotedByDefault = True
 #|||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
 #Specific Functions
@@ -86,37 +131,167 @@ def checkIcon(cmdDef:adsk.core.CommandDefinition, noIconPath:str = './resources/
 	except: cmdDef.resourceFolder = noIconPath
 	return cmdDef
 
-def update_enable_text(curCount=0):
-	if curCount > MAX_TRACK: currentMacro.stopTracking()
-	if not CommandTracker.tracking_: text,icon = 	f'Start recording (Auto-stop after {MAX_TRACK} unique commands)',		'./resources/record'
-	else: text,icon = 								f'Stop recording (Auto-stop after {MAX_TRACK-curCount} more commands)',	'./resources/stop'
+def update_enable_text():
+	if not CommandTracker.tracking_: text,icon = 	f'Start recording (Keeps the last {MAX_TRACK} commands)',	'./resources/record'
+	else: text,icon = 								'Stop recording',											'./resources/stop'
 	UpdateButton(enable_cmd.definition, text, icon)
 
 #|||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
 
+# Every handler goes through here. Live handlers are always counted per source, call times only while profiling is on.
+# A handler registered with an owner is flagged as leaked once the owner is no longer valid but the handler was never removed.
+class HandlerStats:
+	__slots__ = ('source','live','added','removed','calls','total','max')
+	def __init__(self, source:str):
+		self.source = source
+		self.live: 'set[ProfiledHandler]' = set()
+		self.added = self.removed = 0
+		self.resetTimes()
+	def resetTimes(self): self.calls, self.total, self.max = 0, 0.0, 0.0
+	def called(self, seconds:float):
+		self.calls += 1
+		self.total += seconds
+		if seconds > self.max: self.max = seconds
+	@property
+	def leaked(self) -> 'list[ProfiledHandler]': return [handler for handler in self.live if handler.isLeaked]
+	def summary(self):
+		return dict(live=len(self.live), leaked=len(self.leaked), added=self.added, removed=self.removed,
+					calls=self.calls, total_ms=self.total*1000, mean_ms=self.total*1000/self.calls if self.calls else 0.0, max_ms=self.max*1000)
+
+class ProfiledHandler:
+	__slots__ = ('handler','callback','stats','owner')
+	def __init__(self, manager:events.EventsManager, event:adsk.core.Event, callback, stats:HandlerStats, owner=None):
+		self.callback, self.stats, self.owner = callback, stats, owner
+		self.handler = manager.add_handler(event, self)
+		stats.live.add(self); stats.added += 1
+	def __call__(self, args):
+		if not events_manager_.isEnabled: return self.callback(args)
+		start = time.perf_counter()
+		try: return self.callback(args)
+		finally: self.stats.called(time.perf_counter() - start)
+	@property
+	def isLeaked(self): return exists(self.owner) and not getattr(self.owner, 'isValid', True)
+	def remove(self):
+		if self.handler is None: return #Already removed, or cleaned up with the rest at stop
+		self.handler.remove(); self.handler = None
+		self.stats.live.discard(self); self.stats.removed += 1
+
+class HandlerProfiler:
+	def __init__(self, manager:events.EventsManager):
+		self.manager = manager
+		self.isEnabled = False
+		self.sources: 'dict[str,HandlerStats]' = {}
+	def add_handler(self, event:adsk.core.Event, callback, owner=None, source:str=None) -> ProfiledHandler:
+		source = source or callback.__qualname__.replace('<locals>.', '')
+		stats = self.sources.get(source)
+		if stats is None: stats = self.sources[source] = HandlerStats(source)
+		return ProfiledHandler(self.manager, event, callback, stats, owner)
+	def clean_up(self, *args):
+		self.manager.clean_up(*args)
+		for stats in self.sources.values():
+			for handler in stats.live: handler.handler = None
+			stats.removed += len(stats.live); stats.live.clear()
+	def setEnabled(self, isEnabled:bool):
+		if isEnabled and not self.isEnabled: [stats.resetTimes() for stats in self.sources.values()] #Each profiling session starts from zero
+		self.isEnabled = isEnabled
+	#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+	def report(self):
+		describe = lambda owner: getattr(owner, 'id', None) or type(owner).__name__
+		return dict(
+			generated = time.strftime('%Y-%m-%d %H:%M:%S'),
+			profiling = self.isEnabled,
+			liveHandlers = sum(len(stats.live) for stats in self.sources.values()),
+			sources = {source: stats.summary() for source, stats in sorted(self.sources.items())},
+			leaks = [dict(source=stats.source, owner=describe(handler.owner)) for stats in self.sources.values() for handler in stats.leaked])
+	def export(self, filePath:str, report:dict=None) -> bool: return writeReportFile(filePath, report or self.report())
+
+events_manager_ = HandlerProfiler(events.EventsManager(error_catcher_))
+
+#|||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+
+# Command definitions outlive the add-in, stop() only deletes the controls. The hashes written by stop() let the next run adopt
+# every definition that still has the same name, tooltip and icon and only rebuild the ones that changed.
+# The file is removed as soon as it is read, so a session that never reached stop() cannot vouch for definitions it did not write.
+def contentHash(*fields:str): return f'{zlib.crc32(chr(0).join(map(str, fields)).encode("utf-8")):08x}'
+
+class DefinitionCache:
+	def __init__(self):
+		self.previous: 'dict[str,str]' = {} #Id -> hash, as written by the last stop
+		self.contents: 'dict[str,list[str]]' = {} #Id -> [name, tooltip, icon] of the definitions used this session
+		self.adopted = self.created = 0
+	def load(self, filePath:str):
+		self.contents.clear()
+		self.adopted = self.created = 0
+		try:
+			with open(filePath, 'r', encoding='utf-8') as file: self.previous = json.load(file)
+			os.remove(filePath)
+		except (OSError, ValueError): self.previous = {}
+	def save(self, filePath:str): #Definitions not touched this session are kept while Fusion still has them
+		previous = {cmdId: hashed for cmdId, hashed in self.previous.items() if exists(ui_.commandDefinitions.itemById(cmdId))} #Gone after a restart, or removed outside the add-in
+		hashes = dict(previous, **{cmdId: contentHash(*fields) for cmdId, fields in self.contents.items()})
+		writeJsonAtomic(filePath, hashes)
+	#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+	def buttonDefinition(self, cmdId:str, name:str, tooltip:str, icon:str) -> adsk.core.CommandDefinition:
+		self.contents[cmdId] = [name, tooltip, icon]
+		if self.previous.pop(cmdId, None) == contentHash(name, tooltip, icon):
+			cmdDef = ui_.commandDefinitions.itemById(cmdId)
+			if exists(cmdDef): self.adopted += 1; return cmdDef #Its handlers went with the last stop, the caller binds new ones
+		getDelete(ui_.commandDefinitions, cmdId)
+		self.created += 1
+		return ui_.commandDefinitions.addButtonDefinition(cmdId, name, tooltip, icon)
+	def changed(self, cmdId:str, name:str=None, icon:str=None): #Keeps the hash in step with definitions edited after creation
+		fields = self.contents.get(cmdId)
+		if fields is None: return
+		if name is not None: fields[0] = name
+		if icon is not None: fields[2] = icon
+
+definition_cache_ = DefinitionCache()
+
+#|||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+
 class ReferenceBase:
+	__slots__ = ('definition','control','id')
 	def __init__(self,cmdDef:adsk.core.CommandDefinition=None, cmdCtrl: 'adsk.core.CommandControl | adsk.core.DropDownControl'=None):
 		self.definition = cmdDef
 		self.control = cmdCtrl
 		self.id = cmdCtrl.id if exists(cmdCtrl) else cmdDef.id if exists(cmdDef) else None
+	@property
+	def isValid(self): return exists(self.definition) or exists(self.control) #Until deleteMe, like the API objects it wraps
 	def deleteMe(self):	utils.ifDelete(self.control); self.definition=self.control=None
+	def removeControl(self): utils.ifDelete(self.control); self.control=None
 
 class CommandRef(ReferenceBase):
-	def __init__(self,parentControls:adsk.core.ToolbarControls,newId,newName,newIcon='./resources/noicon',newToolTip=''):
-		getDelete(ui_.commandDefinitions, newId)
-		cmdDef = ui_.commandDefinitions.addButtonDefinition(newId, newName, newToolTip, newIcon)
-		super().__init__(cmdDef, parentControls.addCommand(checkIcon(cmdDef)))
+	__slots__ = ()
+	def __init__(self,parentControls:adsk.core.ToolbarControls,newId,newName,newIcon='./resources/noicon',newToolTip=''): #Without parentControls only the definition is created
+		cmdDef = checkIcon(definition_cache_.buttonDefinition(newId, newName, newToolTip, newIcon))
+		super().__init__(cmdDef, parentControls.addCommand(cmdDef) if exists(parentControls) else None)
 	@property
 	def commandCreated(self): return self.definition.commandCreated
+	def addTo(self, parentControls:adsk.core.ToolbarControls): utils.ifDelete(self.control); self.control = parentControls.addCommand(self.definition)
+	def rename(self, newName:str):
+		if self.definition.controlDefinition.name == newName: return
+		self.definition.controlDefinition.name = newName
+		definition_cache_.changed(self.id, name=newName)
 
 class DropdownRef(ReferenceBase):
+	__slots__ = ('dropdownControls',)
 	def __init__(self,parentControls:adsk.core.ToolbarControls,newId,newName,newIcon='./resources/noicon',newToolTip=''):
 		getDelete(parentControls, newId)
 		cmdCtrl:adsk.core.DropDownControl = parentControls.addDropDown(newName, newIcon, newId)
 		self.dropdownControls = cmdCtrl.controls
 		super().__init__(None, cmdCtrl)
+	def rename(self, newName:str):
+		if self.control.name != newName: self.control.name = newName
+	def moveTo(self, parentControls:adsk.core.ToolbarControls, children:'list[CommandRef]'): #Controls cannot be moved, only re-added, the definitions inside are kept
+		name, icon = self.control.name, self.control.resourceFolder
+		utils.ifDelete(self.control)
+		getDelete(parentControls, self.id)
+		self.control = parentControls.addDropDown(name, icon, self.id)
+		self.dropdownControls = self.control.controls
+		for child in children: child.control = self.dropdownControls.addCommand(child.definition)
 	
 class ToggleRef(ReferenceBase):
+	__slots__ = ('controlDefinition',)
 	def __init__(self,parentControls:adsk.core.ToolbarControls,newId,newName,startValue,newToolTip=''):
 		getDelete(ui_.commandDefinitions, newId)
 		cmdDef = ui_.commandDefinitions.addCheckBoxDefinition(newId, newName, newToolTip, startValue)
@@ -125,6 +300,13 @@ class ToggleRef(ReferenceBase):
 	@property
 	def value(self):return self.controlDefinition.isChecked
 
+class FragmentRef(ReferenceBase): #A recorded command in the recorder dropdown, its remove handler is shared by every fragment
+	__slots__ = ('removeInfo',)
+	def __init__(self,cmdDef:adsk.core.CommandDefinition, cmdCtrl:adsk.core.CommandControl, removeHandler):
+		super().__init__(cmdDef, cmdCtrl)
+		self.removeInfo = events_manager_.add_handler(cmdDef.commandCreated, removeHandler, self)
+	def deleteMe(self): self.removeInfo.remove(); super().deleteMe()
+
 # def MakeSeperator(parentControls:adsk.core.ToolbarControls):parentControls.addSeparator
 #|||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
 
@@ -137,6 +319,9 @@ build_macro_cmd:CommandRef = None
 clear_record_cmd:CommandRef = None
 consecutive_block_tgl:ToggleRef=None
 halt_cmd_def:CommandRef = None
+diagnostics_dropdown_:DropdownRef = None
+replay_timing_tgl:ToggleRef = None
+profile_handlers_tgl:ToggleRef = None
 
 
 
@@ -147,110 +332,801 @@ halt_cmd_def:CommandRef = None
 
 
 
+#|||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+
+def searchWords(text:str) -> 'list[str]': return [word.lower() for word in re.findall(r'[A-Z]?[a-z]+|[A-Z]+(?![a-z])|[0-9]+', text)]
+def searchGrams(word:str, isPrefix=False): #Padding makes the start of a word count, queries stay open ended while typing
+	padded = f'  {word}' if isPrefix else f'  {word} '
+	return {padded[index:index+3] for index in range(len(padded)-2)}
+
+# Trigram index over macro names and the command ids they run, kept up to date by the registry.
+# A query only visits the postings of its own trigrams, so typing never rescans the library.
+class MacroSearchIndex:
+	def __init__(self):
+		self.grams: 'dict[str,dict[str,int]]' = {} #Trigram -> macro id -> weight
+		self.entries: 'dict[str,dict[str,int]]' = {} #Macro id -> its trigram weights, so they can be removed again
+		self.names: 'dict[str,str]' = {}
+		self.withSteps: 'set[str]' = set() #Macro ids whose command ids are indexed, not only their name
+
+	def add(self, macro:'Macro', steps:list=None): #Steps read for the index alone are passed in and not kept
+		self.remove(macro.id)
+		if steps is None: steps = macro.loadedSteps
+		if exists(macro._executeList) or steps: self.withSteps.add(macro.id)
+		weights: 'dict[str,int]' = {}
+		for text, weight in ((macro.name or '', SEARCH_NAME_WEIGHT), *((cmdId, 1) for cmdId in set(steps))):
+			for word in searchWords(text):
+				for gram in searchGrams(word): weights[gram] = max(weights.get(gram, 0), weight)
+		self.entries[macro.id] = weights
+		self.names[macro.id] = macro.name or ''
+		for gram, weight in weights.items(): self.grams.setdefault(gram, {})[macro.id] = weight
+
+	def remove(self, macroId:str):
+		self.names.pop(macroId, None)
+		self.withSteps.discard(macroId)
+		for gram in self.entries.pop(macroId, ()):
+			postings = self.grams[gram]
+			del postings[macroId]
+			if not postings: del self.grams[gram]
+
+	def search(self, query:str, limit:int) -> 'list[str]': #Macro ids, best match first
+		def required(grams:set): return len(grams) if len(grams) <= 3 else max(len(grams)-3, (len(grams)+1)//2) #Short words must match, longer ones allow a typo
+		def rarest(grams:set): #Anything matching enough of a word's trigrams appears in at least one of these
+			return sorted(grams, key=lambda gram: len(self.grams.get(gram, ())))[:len(grams)-required(grams)+1]
+		def candidateCount(grams:set): return sum(len(self.grams.get(gram, ())) for gram in rarest(grams))
+		scores: 'dict[str,int]' = None
+		for grams in sorted((searchGrams(word, True) for word in searchWords(query)), key=candidateCount): #Most selective word first
+			candidates = {macroId for gram in rarest(grams) for macroId in self.grams.get(gram, ())} if scores is None else scores
+			postings, minimum = [self.grams.get(gram, {}) for gram in grams], required(grams)
+			wordScores: 'dict[str,int]' = {}
+			for macroId in candidates:
+				weights = [posting[macroId] for posting in postings if macroId in posting]
+				if len(weights) >= minimum: wordScores[macroId] = sum(weights) + (scores[macroId] if scores else 0)
+			scores = wordScores
+			if not scores: return []
+		if not scores: return []
+		return heapq.nsmallest(limit, scores, key=lambda macroId: (-scores[macroId], len(self.names[macroId]), self.names[macroId]))
+
+
+class MacroRegistry:
+	def __init__(self):
+		self.byId: 'dict[str,Macro]' = {}
+		self.byName: 'dict[str,dict[str,Macro]]' = {}
+		self.byCommand: 'dict[str,dict[str,Macro]]' = {} #Command id -> every macro that executes it, once its steps have been read (for macro ids, the macros including it)
+		self.searchIndex = MacroSearchIndex()
+	
+	def __len__(self): return len(self.byId)
+	def __iter__(self): return iter(list(self.byId.values())) #Copied so macros can be removed while iterating
+	def __contains__(self, macroId): return macroId in self.byId
+
+	def get(self, macroId:str) -> 'Macro': return self.byId.get(macroId)
+	def findByName(self, name:str) -> 'list[Macro]': return list(self.byName.get(name, {}).values())
+	def findByCommand(self, cmdId:str) -> 'list[Macro]': return list(self.byCommand.get(cmdId, {}).values())
+	def search(self, query:str, limit:int=SEARCH_RESULT_LIMIT) -> 'list[Macro]': #Macros named exactly like the query come first
+		exact = self.findByName(query.strip())
+		exactIds = {macro.id for macro in exact}
+		return (exact + [self.byId[macroId] for macroId in self.searchIndex.search(query, limit) if macroId not in exactIds])[:limit]
+	#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+	@staticmethod
+	def _index(index:dict, key, macro:'Macro'): index.setdefault(key, {})[macro.id] = macro
+	@staticmethod
+	def _unindex(index:dict, key, macro:'Macro'):
+		entries = index.get(key)
+		if entries is None or entries.get(macro.id) is not macro: return
+		del entries[macro.id]
+		if not entries: del index[key]
+	#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+	def add(self, macro:'Macro') -> 'Macro':
+		replaced = self.byId.get(macro.id)
+		if replaced is macro: return None
+		if exists(replaced): self.discard(replaced) #Same id overwrites the older macro
+		self.byId[macro.id] = macro
+		self._index(self.byName, macro.name, macro)
+		for cmdId in set(macro.loadedSteps): self._index(self.byCommand, cmdId, macro)
+		self.searchIndex.add(macro)
+		self.invalidatePlans(macro.id) #Steps with this id now name a macro
+		return replaced
+
+	def discard(self, macro:'Macro'):
+		if self.byId.get(macro.id) is not macro: return False
+		del self.byId[macro.id]
+		self._unindex(self.byName, macro.name, macro)
+		for cmdId in set(macro.loadedSteps): self._unindex(self.byCommand, cmdId, macro)
+		self.searchIndex.remove(macro.id)
+		self.invalidatePlans(macro.id)
+		return True
+
+	def invalidatePlans(self, macroId:str): #Clears the cached plans that flattened macroId, directly or through other macros
+		pending = [macroId]
+		while pending:
+			for dependent in self.findByCommand(pending.pop()):
+				if dependent._plan is None: continue #Nothing cached depends on an uncached plan
+				dependent._plan = None
+				pending.append(dependent.id)
+
+	def updateCommands(self, macro:'Macro', oldList:list, newList:list):
+		if self.byId.get(macro.id) is not macro: return
+		oldIds, newIds = set(oldList), set(newList)
+		for cmdId in oldIds - newIds: self._unindex(self.byCommand, cmdId, macro)
+		for cmdId in newIds - oldIds: self._index(self.byCommand, cmdId, macro)
+		if oldIds != newIds: self.searchIndex.add(macro)
+
+	def indexUnreadSteps(self): #The save writer reads every unread entry in one batch, the steps only go into the search index
+		unread = [(macro.id, macro.source) for macro in self if macro._executeList is None and exists(macro.source) and macro.id not in self.searchIndex.withSteps]
+		if unread: macro_file_.queue('read', (self.applyUnreadSteps, unread))
+	def applyUnreadSteps(self, stepsById:'dict[str,list]'):
+		for macroId, steps in stepsById.items():
+			macro = self.byId.get(macroId)
+			if exists(macro) and exists(steps) and macro._executeList is None: self.searchIndex.add(macro, steps)
+
+allMacros = MacroRegistry()
+
+#|||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+
+def internSteps(CommandIdList:list) -> 'tuple[str]': return tuple(map(sys.intern, CommandIdList)) #Every macro running a command shares one copy of its id
+
+class MacroCycleError(Exception): pass #A macro that includes itself, directly or through other macros
+
+class MacroCompiler:
+	@classmethod
+	def planOf(cls, macro:'Macro', path:'tuple[str]'=()) -> 'tuple[str]': #Steps naming a saved macro are replaced by its plan, which is cached on the way
+		if macro._plan is not None: return macro._plan
+		if macro.id in path: raise MacroCycleError(' -> '.join(path[path.index(macro.id):] + (macro.id,)))
+		steps = []
+		for cmdId in cls.compile(macro.executeList): #Included plans are already compiled, so their repeats are spliced in untouched
+			included = allMacros.get(cmdId)
+			if exists(included) and included.isBuilt: steps.extend(cls.planOf(included, path + (macro.id,)) * max(included.repeat, 1)) #Repeating until halted only applies when run on its own
+			else: steps.append(cmdId)
+		macro._plan = tuple(steps)
+		return macro._plan
+
+	@staticmethod
+	def compile(executeList:list) -> 'tuple[str]': #Repeated steps are intended, the recorder already drops double starts (and every repeat with Block Consecutive Fires)
+		return tuple(cmdId for cmdId in executeList if cmdId not in NOOP_COMMANDS)
+
+# Checks saved macros against one snapshot of the command definition ids instead of asking Fusion for every step.
+# Results are cached per macro against the steps (or the unread saved entry) they were checked with, so replays only compare identities.
+class LibraryValidator:
+	def __init__(self):
+		self.commandIds: 'set[str]' = None #Taken by the first sweep, ids found later with itemById are added to it
+		self.missingIds: 'set[str]' = set() #Confirmed missing during the current sweep, so each is only looked up once
+		self.results: 'dict[str,tuple]' = {} #Macro id -> (steps or source it was checked against, missing command ids)
+		self.broken: 'set[str]' = set()
+		self.pending = 0 #Sweeps waiting on the save writer for steps that are not read yet
+
+	def isKnown(self, cmdId:str):
+		if cmdId in self.commandIds: return True
+		included = allMacros.get(cmdId)
+		if exists(included) and included.isBuilt: return True #Its own steps are checked separately
+		if cmdId in self.missingIds: return False
+		if not exists(ui_.commandDefinitions.itemById(cmdId)): self.missingIds.add(cmdId); return False #Another add-in may have registered it since the snapshot
+		self.commandIds.add(cmdId)
+		return True
+
+	def missing(self, macro:'Macro') -> 'tuple[str]':
+		cached = self.results.get(macro.id)
+		if exists(cached) and cached[0] is (macro._executeList if exists(macro._executeList) else macro.source): return cached[1]
+		return self.record(macro, macro.executeList, macro.executeList)
+
+	def record(self, macro:'Macro', key, steps:list) -> 'tuple[str]':
+		if self.commandIds is None: self.snapshot()
+		missing = tuple(cmdId for cmdId in dict.fromkeys(MacroCompiler.compile(steps)) if not self.isKnown(cmdId)) #Only what is replayed, no-op ids are dropped
+		self.results[macro.id] = (key, missing)
+		wasBroken, isBroken = macro.id in self.broken, bool(missing)
+		if isBroken: self.broken.add(macro.id)
+		else: self.broken.discard(macro.id)
+		if wasBroken != isBroken and exists(macro.Dropdown) and macro.Dropdown.isValid: macro.Dropdown.rename(macro.label)
+		return missing
+
+	def snapshot(self): self.commandIds = {cmdDef.id for cmdDef in ui_.commandDefinitions}
+	#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+	def sweep(self, macros:'list[Macro]'=None) -> 'dict[str,tuple]': #The whole library when None, returns what could be checked straight away
+		if self.commandIds is None: self.snapshot()
+		self.missingIds.clear()
+		checked, unread = {}, []
+		for macro in allMacros if macros is None else macros:
+			if not macro.isBuilt: continue
+			if macro._executeList is None and exists(macro.source): unread.append((macro.id, macro.source))
+			else: checked[macro.id] = self.missing(macro)
+		if unread: #Read by the save writer so startup never waits on the library files
+			self.pending += 1
+			macro_file_.queue('read', (self.applyReads, unread))
+		elif self.pending == 0: self.writeReport()
+		return checked
+
+	def applyReads(self, stepsById:'dict[str,list]'): #UI thread, steps are only used for the check and never kept
+		self.pending -= 1
+		for macroId, steps in stepsById.items():
+			macro = allMacros.get(macroId)
+			if not exists(macro) or not macro.isBuilt: continue
+			if exists(macro._executeList): self.missing(macro) #Edited since the sweep
+			elif exists(steps): self.record(macro, macro.source, steps)
+		if self.pending == 0: self.writeReport()
+
+	def report(self) -> dict:
+		broken = [allMacros.get(macroId) for macroId in sorted(self.broken)]
+		return dict(time=time.strftime('%Y-%m-%d %H:%M:%S'), commands=len(self.commandIds or ()), checked=len(self.results),
+					broken=[dict(id=macro.id, name=macro.name, missing=list(self.results[macro.id][1])) for macro in broken if exists(macro) and macro.isBuilt])
+
+	def writeReport(self):
+		report = self.report()
+		if not writeReportFile(VALIDATION_REPORT_PATH, report): return
+		if report['broken']: log(f'{len(report["broken"])} of {report["checked"]} macros use commands that do not exist, see {path.basename(VALIDATION_REPORT_PATH)}')
+
+library_validator_ = LibraryValidator()
+
 #|||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
 
 class Macro:
+	__slots__ = ('_executeList','_plan','source','category','repeat','parentControls','isBuilt','id','name',
+				'Dropdown','Command','Repeat','Delete','createInfo','repeatInfo','removeInfo')
 	@staticmethod
 	def fromJson(JsonObject: object):
 		MacroMethod = settings.fromJson(JsonObject, {dict:Macro.fromDict, list:Macro.fromList})
 		return MacroMethod(JsonObject)
 
 	@classmethod
-	def fromList(cls, macroList:list): return [cls.fromDict(dict) for dict in macroList]
+	def fromList(cls, macroList:list): 
+		uniqueDicts = {macroDict['id']:macroDict for macroDict in macroList} #Duplicate ids resolve to the last entry
+		return [cls.fromDict(dict) for dict in uniqueDicts.values()]
 	@classmethod
 	def fromDict(cls, macroDict:dict):
 		MacroName =   macroDict['name']
 		MacroId =     macroDict['id']
-		executeList = macroDict['executeList']
-		parentControl:adsk.core.ToolbarControls = macro_dropdown_.control.controls
-		return Macro(executeList,parentControl,MacroId,MacroName,True)
+		executeList = macroDict.get('executeList') #Missing for entries from the library index, read on first use instead
+		category =    macroDict.get('category')
+		repeat =      macroDict.get('repeat', 1)
+		source =      macroDict.get('source')
+		existing = allMacros.get(MacroId)
+		if exists(existing) and existing.isBuilt and existing.name == MacroName and existing.category == category and existing.repeat == repeat:
+			if (existing.source == source) if executeList is None else (existing.executeList == tuple(executeList)):
+				return existing #Nothing changed, keep the current commands
+		return Macro(executeList,None,MacroId,MacroName,True,category,source,repeat) #Placed by the macro menu
 
-	@classmethod
-	def toList(cls): return [dict for dict in [cls.toDict(macro) for macro in allMacros] if dict]
 	def toDict(self):
-		if self.name == '': return None
+		if not self.isBuilt or not self.name: return None #Unsaved test macros are never written
 		macroDict = {}
 		macroDict['name']=        self.name
 		macroDict['id']=          self.id
-		macroDict['executeList']= self.executeList
+		macroDict['executeList']= list(self.executeList)
+		if self.category: macroDict['category'] = self.category
+		if self.repeat != 1: macroDict['repeat'] = self.repeat
 		return macroDict
+	def toJsonLine(self) -> bytes:
+		return json.dumps(self.toDict(), separators=(',',':')).encode('utf-8')
 
 	#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-	def __init__(self,CommandIdList:list,parentControls:adsk.core.ToolbarControls=None,macroId=None,macroName=None, isBuilt = False):
-		allMacros.append(self)
-		self.executeList = list(CommandIdList)
+	def __init__(self,CommandIdList:list,parentControls:adsk.core.ToolbarControls=None,macroId=None,macroName=None, isBuilt = False, category:str=None, source:tuple=None, repeat:int=1):
+		self._executeList = None if CommandIdList is None else internSteps(CommandIdList)
+		self._plan = None
+		self.source = source if CommandIdList is None else None #(shard file, offset, length) of the saved entry while it matches this macro
+		self.category = category
+		self.repeat = repeat #Runs back to back when replayed, 0 repeats until halted
 		self.parentControls = parentControls or macro_dropdown_.dropdownControls
 		self.isBuilt = isBuilt
 		self.initialise()
 		self.updateIdentity(macroId,macroName)
 	#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+	@property
+	def executeList(self) -> 'tuple[str]':
+		if self._executeList is None:
+			self._executeList = internSteps(macro_file_.readSteps(self.source, self.id)) if exists(self.source) else ()
+			allMacros.updateCommands(self, (), self._executeList)
+		return self._executeList
+	@executeList.setter
+	def executeList(self, CommandIdList:list):
+		self._executeList = internSteps(CommandIdList)
+		self._plan = None
+		allMacros.invalidatePlans(self.id)
+		self.source = None #The saved entry is out of date until the next compaction
+	@property
+	def loadedSteps(self): return self._executeList or ()
+	@property
+	def label(self): return f'{self.name}{BROKEN_MACRO_SUFFIX}' if self.id in library_validator_.broken else self.name
+	@property
+	def plan(self) -> 'tuple[str]': #What actually gets replayed, with included macros flattened in
+		return self._plan if self._plan is not None else MacroCompiler.planOf(self)
+	#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 	def updateIdentity(self,MacroId=None,MacroName=None):
 		if MacroName is None:
 			MacroName, cancelled = ui_.inputBox('Enter macro name:','Naming Macro','')
 			if cancelled or MacroName == '': return False
+		previousId = self.id
+		if exists(previousId): self.executeList = self.executeList #The saved entry (or a pending snapshot of it) still has the old identity
+		allMacros.discard(self)
+		macro_menu_.forget(self)
 		self.name = MacroName
 		self.id = MacroId or f'AnyMacro_{utils.toIdentifier(MacroName)}'
-		self.updateCommands(self.parentControls)
+		replaced = allMacros.add(self)
+		if exists(replaced) and replaced.isBuilt == self.isBuilt: #Same id in the same menu, its controls are patched rather than rebuilt
+			self.adopt(replaced)
+			macro_menu_.replace(replaced, self)
+		if exists(replaced): replaced.removeAll() #Frees whatever was not adopted before this macro claims the ids
+		if self.isBuilt: 
+			macro_menu_.place(self) #The menu decides where the commands go and whether they are built yet
+			if macro_file_.isLoading: pass #Nothing to record, and recording would read every macro's steps
+			elif exists(previousId) and previousId != self.id: macro_file_.record('rename', id=previousId, macro=self.toDict())
+			else: macro_file_.record('add', macro=self.toDict())
+		else: self.updateCommands(self.parentControls)
 		return True
 	#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-	def updateCommands(self, parentControls:adsk.core.ToolbarControls):
+	def updateCommands(self, parentControls:adsk.core.ToolbarControls=None): #Only what differs is changed, without parentControls the macro keeps its definitions but no controls
+		if exists(self.Command) and self.Command.isValid and self.Command.id == self.id: self.Command.rename(self.name); self.Delete.rename(f'Delete {self.name}')
+		else: self.defineCommands() #Definition ids cannot change, so a new id needs new commands
+		hasControls = exists(self.Dropdown) and self.Dropdown.isValid and self.Dropdown.id == f'{self.id}_group'
+		if parentControls is None: self.removeControls() #Its page is not loaded, shortcuts still reach the definitions
+		elif not hasControls: self.buildControls(parentControls)
+		else:
+			if parentControls is not self.parentControls: self.moveCommands(parentControls)
+			self.Dropdown.rename(self.label)
+		if exists(parentControls): self.parentControls = parentControls
+		self.updateHandlers()
+	def defineCommands(self):
+		self.removeHandlers()
 		self.removeCommands()
+		self.Command = CommandRef(None, self.id, self.name, './resources/anymacro')
+		self.Repeat = CommandRef(None, f'{self.id}_repeat', 'Set Repeat...', './resources/repeat',
+								'Sets how many times the macro runs back to back each time it is used.')
+		self.Delete = CommandRef(None, f'{self.id}_delete', f'Delete {self.name}', './resources/delete')
+	def buildControls(self, parentControls:adsk.core.ToolbarControls):
+		if exists(self.Dropdown): self.Dropdown.deleteMe()
+		self.Dropdown = DropdownRef(parentControls, f'{self.id}_group', self.label, './resources/anymacro')
+		for child in (self.Command, self.Repeat, self.Delete): child.addTo(self.Dropdown.dropdownControls)
+	def removeControls(self):
+		if exists(self.Dropdown): self.Dropdown.deleteMe(); self.Dropdown = None
+		for child in (self.Command, self.Repeat, self.Delete): child.removeControl()
+	def moveCommands(self, parentControls:adsk.core.ToolbarControls): #Also re-adds the controls at the end of the same parent
+		self.Dropdown.moveTo(parentControls, (self.Command, self.Repeat, self.Delete))
 		self.parentControls = parentControls
-		self.Dropdown = DropdownRef(parentControls, f'{self.id}_group', self.name, './resources/anymacro')
-		self.Command = CommandRef(self.Dropdown.dropdownControls, self.id, self.name, './resources/anymacro')
-		self.Delete = CommandRef(self.Dropdown.dropdownControls, f'{self.id}_delete', f'Delete {self.name}', './resources/delete')
-		self.updateHandlers(self.executeList)
+	def adopt(self, other:'Macro'): #Takes over the controls of the macro this one replaces, its handlers are bound again
+		self.removeHandlers(); self.removeCommands() #Its own controls (the recorder's test macro when saved over an existing name)
+		other.removeHandlers()
+		self.parentControls, self.Dropdown, self.Command, self.Repeat, self.Delete = other.parentControls, other.Dropdown, other.Command, other.Repeat, other.Delete
+		other.Dropdown = other.Command = other.Repeat = other.Delete = None
 	#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 	def updateHandlers(self,CommandIdList:list = None):
-		self.removeHandlers()
-		self.executeList = list(CommandIdList)
-		def MacroRemoveHandler(args:adsk.core.CommandCreatedEventArgs):
-			result = utils.MessagePromptCast(f'Are you sure you wish to delete the macro "{self.name}"?', 'Confirm Macro Deletion')
-			if result is not True: return #Cancels the deletion
-			self.removeAll()
-			if self.isBuilt: macrosToJson() #Updates the save file
-			else: currentMacro.clear() #Removes the history along with it
-		self.createInfo = events_manager_.add_handler(self.Command.commandCreated, getQueuedEvents(self.executeList))
-		self.removeInfo = events_manager_.add_handler(self.Delete.commandCreated, MacroRemoveHandler)
-		if self.isBuilt: macrosToJson()
+		listChanged = CommandIdList is not None and tuple(CommandIdList) != self.executeList
+		if listChanged:
+			oldList, self.executeList = self.executeList, CommandIdList
+			allMacros.updateCommands(self, oldList, self.executeList)
+		if not exists(self.createInfo): self.createInfo = events_manager_.add_handler(self.Command.commandCreated, self.replay, self.Command)
+		if not exists(self.repeatInfo): self.repeatInfo = events_manager_.add_handler(self.Repeat.commandCreated, self.repeatHandler, self.Repeat)
+		if not exists(self.removeInfo): self.removeInfo = events_manager_.add_handler(self.Delete.commandCreated, self.removeHandler, self.Delete)
+		if self.isBuilt and listChanged: macro_file_.record('steps', id=self.id, executeList=list(self.executeList))
+	#Bound methods rather than closures, so a macro holds no per-handler function objects
+	def replay(self, args:adsk.core.CommandCreatedEventArgs=None):
+		try: plan = self.plan #Saved macros read their steps the first time they run
+		except MacroCycleError as cycle: return ui_.messageBox(f'"{self.name}" cannot run because it includes itself:\n{cycle}', 'AnyMacro')
+		missing = library_validator_.missing(self) #Cached by the last sweep, only rechecked once the steps change
+		if missing: log(f'Macro "{self.id}" uses commands that do not exist: {", ".join(missing)}')
+		replay_dispatcher_.submit(ReplayPlan(plan, self.id, self.repeat))
+	def repeatHandler(self, args:adsk.core.CommandCreatedEventArgs):
+		prompt = f'How many times should "{self.name}" run each time it is used?\nEnter 0 to repeat it until "Stop current Macro" is used.'
+		value, cancelled = ui_.inputBox(prompt, 'Repeat Macro', str(self.repeat))
+		if cancelled: return
+		try: self.setRepeat(int(value))
+		except ValueError: ui_.messageBox(f'"{value}" is not a whole number of runs.', 'Repeat Macro')
+	def removeHandler(self, args:adsk.core.CommandCreatedEventArgs):
+		result = utils.MessagePromptCast(f'Are you sure you wish to delete the macro "{self.name}"?', 'Confirm Macro Deletion')
+		if result is not True: return #Cancels the deletion
+		self.removeAll()
+		if self.isBuilt: macro_file_.record('delete', id=self.id) #Updates the save file
+		else: currentMacro.clear() #Removes the history along with it
+	def setRepeat(self, repeat:int):
+		if repeat < 0 or repeat == self.repeat: return
+		self.repeat = repeat
+		if not self.isBuilt: return
+		self.executeList = self.executeList #The saved entry no longer matches
+		macro_file_.record('add', macro=self.toDict())
 	#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 	def initialise(self):
+		self.id = self.name = None
 		self.Dropdown:DropdownRef=None
 		self.Command:CommandRef=None
+		self.Repeat:CommandRef=None
 		self.Delete:CommandRef=None
-		self.createInfo = self.removeInfo = None
+		self.createInfo = self.repeatInfo = self.removeInfo = None
 	def removeCommands(self):
-		[cmd.deleteMe() for cmd in (self.Dropdown,self.Command,self.Delete) if exists(cmd)]
+		[cmd.deleteMe() for cmd in (self.Dropdown,self.Command,self.Repeat,self.Delete) if exists(cmd)]
+		self.Dropdown = self.Command = self.Repeat = self.Delete = None
 	def removeHandlers(self):
-		[handler.remove() for handler in (self.createInfo,self.removeInfo) if exists(handler)]
+		[handler.remove() for handler in (self.createInfo,self.repeatInfo,self.removeInfo) if exists(handler)]
+		self.createInfo = self.repeatInfo = self.removeInfo = None
 	def removeAll(self): 
 		self.removeHandlers()
 		self.removeCommands()
-		allMacros.remove(self)
+		allMacros.discard(self)
+		macro_menu_.forget(self)
 	#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 
-def getQueuedEvents(executeList:deque):
-	def initialCreate(args: adsk.core.CommandCreatedEventArgs):
-		currentCommand = None
-		commandOrder = deque(executeList)
-		def stopHandlers():
-			nonlocal currentCommand; currentCommand = None
-			startingInfo.remove(); terminatedInfo.remove()
-
-		def CmdStartingHandler(args:adsk.core.ApplicationCommandEventArgs):
-			if args.commandId == HALT_CMD_ID: return stopHandlers()
-			if args.commandId == commandOrder[0]:
-				nonlocal currentCommand; currentCommand = commandOrder.popleft()
-			if len(commandOrder) == 0: stopHandlers()
-		def CmdTerminatedHandler(args:adsk.core.ApplicationCommandEventArgs):
-			if args.commandId == currentCommand:
-				if len(commandOrder) == 0: stopHandlers()
-				else: utils.executeCommand(commandOrder[0])
-				
-		startingInfo = events_manager_.add_handler(ui_.commandStarting, CmdStartingHandler)
-		terminatedInfo = events_manager_.add_handler(ui_.commandTerminated, CmdTerminatedHandler)
-		utils.executeCommand(commandOrder[0])
-	return initialCreate
+class ReplayPlan:
+	def __init__(self, executeList:list, macroId:str=None, iterations:int=1):
+		self.macroId = macroId
+		self.steps = tuple(executeList)
+		self.iterations = iterations #0 repeats until halted
+		self.iteration = 1
+		self.commandOrder = deque(self.steps)
+		self.currentCommand:str = None
+		self.armToken = 0 #Changes whenever the plan stops waiting, so stale watchdog entries can be skipped
+		self.isTimed = replay_timings_.isEnabled #Checked once per run so untimed runs never touch the clock
+		self.queuedAt = time.monotonic()
+		self.runStart = self.stepIssued = self.stepStarted = self.iterationStart = time.perf_counter() if self.isTimed else 0.0
+	@property
+	def expected(self): return self.commandOrder[0] if self.commandOrder else None
+	@property
+	def isFinished(self): return not self.commandOrder
+	@property
+	def hasNextIteration(self): return bool(self.steps) and (self.iterations == 0 or self.iteration < self.iterations)
+	def nextIteration(self): #The same plan is refilled, so nothing is re-armed between iterations
+		self.commandOrder.extend(self.steps)
+		self.iteration += 1
+
+
+# One pair of application handlers serves every running macro, each event is matched to its plans with a dict lookup.
+# Plans waiting on a command that never starts (escaped, renamed, missing) are cancelled by the watchdog.
+# Only one plan runs at a time, the others wait in the queue until its last command has terminated.
+class ReplayDispatcher:
+	def __init__(self):
+		self.current:ReplayPlan = None
+		self.queue: 'deque[ReplayPlan]' = deque()
+		self.waitTimes:LatencyHistogram = None #Created by start, submit -> first step issued
+		self.counts = dict(submitted=0, started=0, dropped=0, preempted=0, flushed=0)
+		self.maxDepth = 0
+		self.waiting: 'dict[str,deque[ReplayPlan]]' = {} #Plans waiting for their next command to start
+		self.running: 'dict[str,deque[ReplayPlan]]' = {} #Plans waiting for their current command to terminate
+		self.armed: 'deque[tuple]' = deque() #(plan, armToken, startCount, deadline) in the order plans began waiting
+		self.aborts: 'deque[dict]' = deque(maxlen=50)
+		self.startCount = 0
+		self.startingInfo = self.terminatedInfo = self.watchdogInfo = None
+		self.watchdogStop:threading.Event = None
+
+	def start(self):
+		if exists(self.startingInfo): return
+		self.waitTimes = LatencyHistogram()
+		self.startingInfo = events_manager_.add_handler(ui_.commandStarting, self.CmdStartingHandler)
+		self.terminatedInfo = events_manager_.add_handler(ui_.commandTerminated, self.CmdTerminatedHandler)
+		if REPLAY_STEP_TIMEOUT > 0: self.startWatchdog()
+	def stop(self):
+		self.stopWatchdog()
+		[handler.remove() for handler in (self.startingInfo,self.terminatedInfo) if exists(handler)]
+		self.startingInfo = self.terminatedInfo = None
+		self.haltAll()
+	#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+	# Timeouts need a clock tick even when no commands run, the thread only wakes the UI while a plan is waiting.
+	def startWatchdog(self):
+		self.watchdogInfo = events_manager_.add_handler(utils.CustomEvents.Create(REPLAY_WATCHDOG_EVENT_ID), lambda args: self.checkStalled(), source='ReplayDispatcher.checkStalled')
+		self.watchdogStop = stopEvent = threading.Event()
+		def tick():
+			while not stopEvent.wait(WATCHDOG_INTERVAL):
+				if self.armed: app_.fireCustomEvent(REPLAY_WATCHDOG_EVENT_ID)
+		threading.Thread(target=tick, name=REPLAY_WATCHDOG_EVENT_ID, daemon=True).start()
+	def stopWatchdog(self):
+		if self.watchdogStop is None: return
+		self.watchdogStop.set(); self.watchdogStop = None
+		self.watchdogInfo.remove(); self.watchdogInfo = None
+		utils.CustomEvents.Remove(REPLAY_WATCHDOG_EVENT_ID)
+
+	def checkStalled(self): #Entries are in arming order so only the front ever needs checking
+		now = time.monotonic()
+		while self.armed:
+			plan, armToken, startCount, deadline = self.armed[0]
+			if plan.armToken != armToken: self.armed.popleft(); continue #Already moved on
+			if REPLAY_UNRELATED_LIMIT > 0 and self.startCount - startCount > REPLAY_UNRELATED_LIMIT: reason = 'unrelated commands'
+			elif REPLAY_STEP_TIMEOUT > 0 and now > deadline: reason = 'timeout'
+			else: return
+			self.armed.popleft()
+			self.aborts.append(dict(macro=plan.macroId, command=plan.expected, reason=reason, time=time.strftime('%H:%M:%S')))
+			self.detach(plan)
+	#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+	@staticmethod
+	def _push(index:dict, key:str, plan:ReplayPlan): 
+		plans = index.get(key)
+		if plans is None: plans = index[key] = deque()
+		plans.append(plan)
+	@staticmethod
+	def _pop(index:dict, key:str) -> ReplayPlan:
+		plans = index.get(key)
+		if not plans: return None
+		plan = plans.popleft()
+		if not plans: del index[key]
+		return plan
+	@staticmethod
+	def _remove(index:dict, key:str, plan:ReplayPlan):
+		plans = index.get(key)
+		if not plans or plan not in plans: return
+		plans.remove(plan)
+		if not plans: del index[key]
+	#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+	def submit(self, plan:ReplayPlan, policy:str=None) -> bool: #Every macro run goes through here, False if it was dropped
+		self.counts['submitted'] += 1
+		if plan.isFinished: return False
+		if self.current is None: self.begin(plan); return True
+		policy = policy or REPLAY_QUEUE_POLICY
+		if policy == 'preempt':
+			self.counts['preempted'] += 1
+			self.queue.appendleft(plan) #Started as soon as the running plan is detached
+			self.detach(self.current, 'preempted')
+		elif policy == 'drop' or len(self.queue) >= REPLAY_QUEUE_LIMIT:
+			self.counts['dropped'] += 1
+			log(f'Macro "{plan.macroId}" was not run, "{self.current.macroId}" is still running')
+			return False
+		else: self.queue.append(plan)
+		self.maxDepth = max(self.maxDepth, len(self.queue))
+		return True
+	def begin(self, plan:ReplayPlan):
+		self.current = plan
+		self.counts['started'] += 1
+		self.waitTimes.add(time.monotonic() - plan.queuedAt)
+		if plan.isTimed: plan.runStart = plan.iterationStart = time.perf_counter() #Time spent queued is not part of the run
+		self.attach(plan)
+	def release(self, plan:ReplayPlan): #The plan no longer runs, the next queued one starts
+		if plan is not self.current: return
+		self.current = None
+		if self.queue: self.begin(self.queue.popleft())
+	def flush(self):
+		if not self.queue: return
+		self.counts['flushed'] += len(self.queue)
+		log(f'{len(self.queue)} queued macro runs were cancelled')
+		self.queue.clear()
+	def halt(self): #Stop current Macro
+		if HALT_FLUSHES_QUEUE: self.flush()
+		if exists(self.current): self.detach(self.current, 'halted')
+	def queueStats(self):
+		return dict(policy=REPLAY_QUEUE_POLICY, current=self.current.macroId if exists(self.current) else None, depth=len(self.queue), maxDepth=self.maxDepth,
+					wait=(self.waitTimes or LatencyHistogram()).summary(), **self.counts)
+	#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+	def attach(self, plan:ReplayPlan):
+		if plan.isFinished: return
+		self._push(self.waiting, plan.expected, plan)
+		plan.armToken += 1
+		self.armed.append((plan, plan.armToken, self.startCount, time.monotonic() + REPLAY_STEP_TIMEOUT))
+		if plan.isTimed: plan.stepIssued = time.perf_counter()
+		utils.executeCommand(plan.expected)
+	def detach(self, plan:ReplayPlan, outcome:str='cancelled'):
+		plan.armToken += 1
+		self._remove(self.waiting, plan.expected, plan)
+		self._remove(self.running, plan.currentCommand, plan)
+		plan.currentCommand = None
+		if not plan.isFinished: #A finished plan was only waiting for its last command to terminate
+			if plan.isTimed: replay_timings_.runAborted(plan)
+			self.ended(plan, outcome)
+		releaseCamera()
+		self.release(plan)
+	def haltAll(self):
+		self.flush()
+		if exists(self.current): self.detach(self.current, 'halted')
+		self.armed.clear()
+
+	def CmdStartingHandler(self, args:adsk.core.ApplicationCommandEventArgs):
+		if args.commandId == HALT_CMD_ID: return self.halt()
+		self.startCount += 1
+		plan = self._pop(self.waiting, args.commandId)
+		if plan is None: return self.checkStalled() if self.armed else None
+		plan.armToken += 1
+		plan.currentCommand = plan.commandOrder.popleft()
+		if plan.isTimed: replay_timings_.stepStarted(plan)
+		if plan.isFinished and plan.hasNextIteration:
+			if plan.isTimed: replay_timings_.iterationFinished(plan)
+			plan.nextIteration()
+		if plan.currentCommand in CAMERA_COMMAND_IDS: #Decided before the step's own handler runs
+			cameraCommands().CameraTransaction.isHeld = MERGE_CAMERA_STEPS and plan.expected in CAMERA_COMMAND_IDS
+		self._push(self.running, plan.currentCommand, plan) #Still holds the queue while its last command runs
+		if not plan.isFinished: return
+		if plan.isTimed: replay_timings_.runFinished(plan)
+		self.ended(plan, 'finished')
+	def ended(self, plan:ReplayPlan, outcome:str):
+		if plan.iterations == 1: return
+		completed = plan.iteration if outcome == 'finished' else plan.iteration-1 #The interrupted iteration does not count
+		log(f'Macro "{plan.macroId}" {outcome} after {completed} of {plan.iterations or "unlimited"} iterations')
+	def CmdTerminatedHandler(self, args:adsk.core.ApplicationCommandEventArgs):
+		plan = self._pop(self.running, args.commandId)
+		if plan is None: return
+		if plan.isTimed: replay_timings_.stepTerminated(plan)
+		plan.currentCommand = None
+		if plan.isFinished: return self.release(plan)
+		self.attach(plan)
+
+replay_dispatcher_ = ReplayDispatcher()
+
+#|||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+
+class LatencyHistogram:
+	def __init__(self):
+		self.samples: 'deque[float]' = deque(maxlen=TIMING_SAMPLE_COUNT)
+		self.count = 0
+		self.max = 0.0
+	def add(self, seconds:float):
+		self.samples.append(seconds)
+		self.count += 1
+		if seconds > self.max: self.max = seconds
+	def summary(self):
+		ordered = sorted(self.samples)
+		percentile = lambda ratio: ordered[min(len(ordered)-1, int(ratio*len(ordered)))]*1000 if ordered else 0.0
+		return dict(count=self.count, p50_ms=percentile(0.50), p95_ms=percentile(0.95), max_ms=self.max*1000)
+
+
+# Only plans created while the timing toggle is checked report here.
+class ReplayTimings:
+	def __init__(self): self.clear()
+	def clear(self):
+		self.runTimes: 'dict[str,LatencyHistogram]' = {}
+		self.iterationTimes: 'dict[str,LatencyHistogram]' = {} #Only for macros that repeat
+		self.startLatency: 'dict[str,LatencyHistogram]' = {} #executeCommand -> commandStarting
+		self.stepTimes: 'dict[str,LatencyHistogram]' = {} #commandStarting -> commandTerminated
+		self.abortedRuns: 'dict[str,int]' = {}
+
+	@property
+	def isEnabled(self): return exists(replay_timing_tgl) and replay_timing_tgl.value
+	@staticmethod
+	def _histogram(index:dict, key:str) -> LatencyHistogram:
+		histogram = index.get(key)
+		if histogram is None: histogram = index[key] = LatencyHistogram()
+		return histogram
+	#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+	def stepStarted(self, plan:ReplayPlan):
+		plan.stepStarted = time.perf_counter()
+		self._histogram(self.startLatency, plan.currentCommand).add(plan.stepStarted - plan.stepIssued)
+	def stepTerminated(self, plan:ReplayPlan):
+		self._histogram(self.stepTimes, plan.currentCommand).add(time.perf_counter() - plan.stepStarted)
+	def iterationFinished(self, plan:ReplayPlan):
+		now = time.perf_counter()
+		self._histogram(self.iterationTimes, str(plan.macroId)).add(now - plan.iterationStart)
+		plan.iterationStart = now
+	def runFinished(self, plan:ReplayPlan):
+		if plan.iterations != 1: self.iterationFinished(plan)
+		self._histogram(self.runTimes, str(plan.macroId)).add(time.perf_counter() - plan.runStart)
+	def runAborted(self, plan:ReplayPlan):
+		self.abortedRuns[str(plan.macroId)] = self.abortedRuns.get(str(plan.macroId), 0) + 1
+	#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+	def report(self):
+		macroIds = self.runTimes.keys() | self.abortedRuns.keys() | self.iterationTimes.keys()
+		commandIds = self.startLatency.keys() | self.stepTimes.keys()
+		summary = lambda index, key: index[key].summary() if key in index else LatencyHistogram().summary()
+		return dict(
+			generated = time.strftime('%Y-%m-%d %H:%M:%S'),
+			macros = {macroId: dict(runs=summary(self.runTimes, macroId), aborted=self.abortedRuns.get(macroId, 0),
+									**({'iterations':summary(self.iterationTimes, macroId)} if macroId in self.iterationTimes else {})) for macroId in sorted(macroIds)},
+			commands = {cmdId: dict(startLatency=summary(self.startLatency, cmdId), duration=summary(self.stepTimes, cmdId)) for cmdId in sorted(commandIds)},
+			watchdogAborts = list(replay_dispatcher_.aborts),
+			queue = replay_dispatcher_.queueStats()
+		)
+	def export(self, filePath:str) -> bool: return writeReportFile(filePath, self.report())
+
+replay_timings_ = ReplayTimings()
+
+#|||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+
+def footprint(obj, seen:set) -> int: #Bytes reachable from obj that are not in seen yet, Fusion and AddinLib objects are counted but not followed
+	if id(obj) in seen: return 0
+	seen.add(id(obj))
+	size = sys.getsizeof(obj)
+	if isinstance(obj, dict): size += sum(footprint(key, seen) + footprint(value, seen) for key, value in obj.items())
+	elif isinstance(obj, (list, tuple, set, frozenset, deque)): size += sum(footprint(item, seen) for item in obj)
+	elif type(obj).__module__ == __name__:
+		for slot in {slot for cls in type(obj).__mro__ for slot in cls.__dict__.get('__slots__', ())}: size += footprint(getattr(obj, slot, None), seen)
+		if hasattr(obj, '__dict__'): size += footprint(vars(obj), seen)
+	return size
+
+def memoryReport() -> dict:
+	shared = lambda: {id(stats) for stats in events_manager_.sources.values()} #Handler stats belong to every handler of a source, not to one macro
+	macros, seen = list(allMacros), shared()
+	entries = [dict(id=macro.id, name=macro.name, steps=len(macro.loadedSteps), bytes=footprint(macro, shared())) for macro in macros]
+	report = dict(
+		macros = len(macros),
+		loadedMacros = sum(1 for macro in macros if macro._executeList is not None),
+		commandIds = len(allMacros.byCommand),
+		macroBytes = sum(footprint(macro, seen) for macro in macros), #Command ids and other shared objects counted once
+		unsharedBytes = sum(entry['bytes'] for entry in entries), #The same macros counted one at a time
+		searchIndexBytes = footprint(allMacros.searchIndex, seen),
+		registryBytes = footprint(allMacros, seen),
+		recorderBytes = footprint(currentMacro, seen) if exists(currentMacro) else 0)
+	report['totalBytes'] = sum(report[key] for key in ('macroBytes','searchIndexBytes','registryBytes','recorderBytes'))
+	report['largest'] = sorted(entries, key=lambda entry: entry['bytes'], reverse=True)
+	return report
+
+#|||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+
+class MacroPage:
+	def __init__(self,parentControls:adsk.core.ToolbarControls, index:int, isLoaded:bool):
+		self.macros: 'dict[str,Macro]' = {}
+		self.isLoaded = isLoaded
+		pageId, first = f'{MACRO_DROPDOWN_ID}_Page{index}', index*MACRO_PAGE_SIZE + 1
+		self.Dropdown = DropdownRef(parentControls, pageId, f'Macros {first} - {first+MACRO_PAGE_SIZE-1}', './resources/allmacros')
+		self.Loader:CommandRef = None
+		self.loadInfo = None
+		if not isLoaded: #A single placeholder stands in for the page until it is opened
+			self.Loader = CommandRef(self.Dropdown.dropdownControls, f'{pageId}_Load', 'Load macros...', './resources/allmacros', 
+									'Shows the macros on this page.')
+			self.loadInfo = events_manager_.add_handler(self.Loader.commandCreated, lambda args: self.load(), self.Loader, 'MacroPage.load')
+
+	@property
+	def isFull(self): return len(self.macros) >= MACRO_PAGE_SIZE
+
+	def add(self, macro:'Macro'):
+		self.macros[macro.id] = macro
+		macro.updateCommands(self.Dropdown.dropdownControls if self.isLoaded else None) #Definitions and handlers are made either way, only the controls wait
+	def remove(self, macro:'Macro'):
+		if self.macros.get(macro.id) is macro: del self.macros[macro.id]
+
+	def load(self):
+		if self.isLoaded: return
+		self.isLoaded = True
+		self.loadInfo.remove()
+		self.Loader.control.isVisible = False #Still being executed, so hide it rather than deleting it
+		for macro in self.macros.values(): macro.updateCommands(self.Dropdown.dropdownControls)
+
+	def deleteMe(self):
+		if exists(self.loadInfo) and not self.isLoaded: self.loadInfo.remove()
+		self.Dropdown.deleteMe()
+
+
+class MacroMenu:
+	def __init__(self):
+		self.pages: 'list[MacroPage]' = []
+		self.pageOf: 'dict[str,MacroPage]' = {}
+		self.pending: 'dict[str,Macro]' = {} #Placed while suspended
+		self.suspendCount = 0
+		self.isPaged = self.isLazy = False
+
+	@staticmethod
+	def layoutFor(macroCount:int):
+		isPaged = macroCount > MACRO_PAGE_SIZE
+		return isPaged, isPaged and macroCount > LAZY_CONTROLS_THRESHOLD
+	def configure(self, macroCount:int): #Layout is decided from the library size at startup and after bulk imports
+		self.clear()
+		self.isPaged, self.isLazy = self.layoutFor(macroCount)
+
+	@contextmanager
+	def suspended(self): #Bulk changes are placed in one pass once the last suspension ends
+		self.suspendCount += 1
+		try: yield self
+		finally:
+			self.suspendCount -= 1
+			if self.suspendCount == 0: self.placePending()
+
+	def placePending(self):
+		pending = list(self.pending.values())
+		self.pending.clear()
+		if self.layoutFor(sum(macro.isBuilt for macro in allMacros)) != (self.isPaged, self.isLazy): return self.rebuild()
+		for macro in pending: self.place(macro)
+
+	def rebuild(self):
+		macros = [macro for macro in allMacros if macro.isBuilt]
+		for macro in macros: macro.removeHandlers(); macro.removeCommands()
+		for page in self.pages: page.deleteMe()
+		self.configure(len(macros))
+		for macro in macros: self.place(macro)
+
+	def place(self, macro:'Macro'):
+		if self.suspendCount: self.pending[macro.id] = macro; return
+		if not self.isPaged: return macro.updateCommands(macro_dropdown_.dropdownControls)
+		page = self.pageOf.get(macro.id)
+		if page is None or page.macros.get(macro.id) is not macro: #Replacements stay on the page they took over
+			page = self.pages[-1] if self.pages and not self.pages[-1].isFull else self.addPage()
+			self.pageOf[macro.id] = page
+		page.add(macro)
+	def replace(self, old:'Macro', new:'Macro'):
+		if self.pending.get(old.id) is old: self.pending[old.id] = new
+		page = self.pageOf.get(old.id)
+		if exists(page) and page.macros.get(old.id) is old: page.macros[old.id] = new
+
+	def forget(self, macro:'Macro'):
+		if self.pending.get(macro.id) is macro: del self.pending[macro.id]
+		page = self.pageOf.get(macro.id)
+		if page is None or page.macros.get(macro.id) is not macro: return
+		page.remove(macro)
+		del self.pageOf[macro.id]
+
+	def addPage(self):
+		page = MacroPage(macro_dropdown_.dropdownControls, len(self.pages), not self.isLazy)
+		self.pages.append(page)
+		return page
+
+	def clear(self):
+		self.pages.clear()
+		self.pageOf.clear()
+		self.pending.clear()
+
+macro_menu_ = MacroMenu()
 
 #|||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
 
@@ -265,9 +1141,11 @@ def getQueuedEvents(executeList:deque):
 
 
 #TODO: Convert Command tracker into singleton, or try to merge with Macro class
+# While recording only (fragmentNumber, commandId, timestamp) records are kept, the editable fragments are built when recording stops.
 class CommandTracker:
 	deleteID = 0
 	tracking_ = False
+	skippedIds = frozenset((ENABLE_CMD_DEF_ID,'SelectCommand')) # Skip ourselves/Select
 	@classmethod
 	def toggle(cls,value):
 		cls.tracking_ = value
@@ -276,8 +1154,8 @@ class CommandTracker:
 	#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 
 	def __init__(self,): 
-		self.executeList: 'deque[ReferenceBase]' = deque()
-		self.cmdIds: dict = {}
+		self.records: 'deque[tuple[int,str,float]]' = deque(maxlen=MAX_TRACK) #Oldest commands fall off once full
+		self.fragments: 'dict[int,FragmentRef]' = {}
 		self.currentMacro:Macro=None
 		self.currentSeperator:adsk.core.SeparatorControl = None
 		self.startTracking()
@@ -291,60 +1169,78 @@ class CommandTracker:
 		CommandTracker.toggle(False)
 		self.removeHandler()
 		if self.count == 0: return
+		utils.ifDelete(self.currentSeperator)
+		self.buildFragments()
 		getDelete(tracking_dropdown_.dropdownControls, 'DemoMacroSeperator')
 		self.currentSeperator = tracking_dropdown_.dropdownControls.addSeparator('DemoMacroSeperator')
-		self.currentMacro = Macro(self.cmdIds.values(), tracking_dropdown_.dropdownControls, 'TestMacroId', 'Test Macro')
+		if exists(self.currentMacro) and exists(self.currentMacro.Dropdown): #Re-added after the new fragments, its definitions and handlers are kept
+			self.currentMacro.updateHandlers(self.commandIds)
+			self.currentMacro.moveCommands(tracking_dropdown_.dropdownControls)
+		else: self.currentMacro = Macro(self.commandIds, tracking_dropdown_.dropdownControls, TEST_MACRO_ID, 'Test Macro')
 
 	def getHandler(self):
 		def command_starting_handler(args:adsk.core.ApplicationCommandEventArgs):
-			cmdDef = args.commandDefinition
-			if cmdDef.id in {enable_cmd.id,'SelectCommand'}:return # Skip ourselves/Select
-			elif cmdDef.id != self.lastID: self.log(cmdDef) #Commands start twice? Dont log that.
+			cmdId = args.commandId
+			if cmdId in CommandTracker.skippedIds: return
+			elif cmdId != self.lastID: self.log(cmdId) #Commands start twice? Dont log that.
 			elif not consecutive_block_tgl.value: self.lastID = ''
 		self.starting_handler = events_manager_.add_handler(ui_.commandStarting, command_starting_handler)
 	def removeHandler(self): self.starting_handler.remove()
 	#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 
 	@property
-	def count(self):return len(self.executeList)
+	def count(self):return len(self.records)
+	@property
+	def commandIds(self): return [cmdId for _,cmdId,_ in self.records]
 
-	def log(self, cmdDef: adsk.core.CommandDefinition):
-		self.lastID = cmdDef.id
-		newId = f'{cmdDef.id}_Macro_Fragment_{CommandTracker.deleteID}'
+	def log(self, cmdId:str):
+		self.lastID = cmdId
+		self.records.append((CommandTracker.deleteID, sys.intern(cmdId), time.time()))
 		CommandTracker.deleteID +=1
-		self.cmdIds[newId] = cmdDef.id
+
+	def buildFragments(self):
+		liveNumbers = {number for number,_,_ in self.records}
+		for number in [number for number in self.fragments if number not in liveNumbers]: self.fragments.pop(number).deleteMe() #Pushed out of the buffer
+		for number, cmdId, timestamp in self.records:
+			if number not in self.fragments: self.fragments[number] = self.buildFragment(number, cmdId, timestamp)
+
+	def buildFragment(self, number:int, cmdId:str, timestamp:float):
+		newId = f'{cmdId}_Macro_Fragment_{number}'
+		cmdDef = ui_.commandDefinitions.itemById(cmdId)
+		name, icon = (cmdDef.name, checkIcon(cmdDef).resourceFolder) if exists(cmdDef) else (cmdId, './resources/noicon')
+		tooltip = f'Recorded at {time.strftime("%H:%M:%S", time.localtime(timestamp))}. Click to remove this command from the Macro'
 
 		getDelete(ui_.commandDefinitions, newId)
-		newCmdDef = ui_.commandDefinitions.addButtonDefinition(newId, cmdDef.name,'Click to remove this command from the Macro', checkIcon(cmdDef).resourceFolder)
+		newCmdDef = ui_.commandDefinitions.addButtonDefinition(newId, name, tooltip, icon)
 		newCmdCtrl = tracking_dropdown_.dropdownControls.addCommand(newCmdDef)
+		return FragmentRef(newCmdDef, newCmdCtrl, self.removeFragment)
 
-		def removeHandler(args: adsk.core.CommandCreatedEventArgs):	
-			getDelete(tracking_dropdown_.dropdownControls, newCmdDef.id)
-			removeInfo.remove()
-			self.cmdIds.pop(newId)
-			self.currentMacro.updateHandlers(self.cmdIds.values())
-
-		removeInfo = events_manager_.add_handler(newCmdDef.commandCreated,removeHandler)
-		self.executeList.append(ReferenceBase(newCmdDef,newCmdCtrl))
-		update_enable_text(self.count)
+	def removeFragment(self, args: adsk.core.CommandCreatedEventArgs): #Shared by every fragment, the number is the end of its id
+		number = int(args.command.parentCommandDefinition.id.rpartition('_')[2])
+		fragment = self.fragments.pop(number, None)
+		if exists(fragment): fragment.deleteMe()
+		self.records = deque((record for record in self.records if record[0] != number), maxlen=MAX_TRACK)
+		self.currentMacro.updateHandlers(self.commandIds)
 
 	def build(self):
+		if CommandTracker.tracking_: self.stopTracking() #Fragments and the test macro only exist once stopped
 		if self.count == 0: return
 		self.currentMacro.isBuilt = True #Enables the remove handler to update the json
 		oldControls = self.currentMacro.parentControls
 		self.currentMacro.parentControls = macro_dropdown_.dropdownControls
-		if self.currentMacro.updateIdentity(): #Forces the macro to ask for a name and update
-			macrosToJson() #Saves all current macros
-			self.clear()
-		else: 
-			self.currentMacro.isBuilt = False
-			self.currentMacro.parentControls = oldControls
+		with macro_file_.deferred(): #Renaming and saving only writes the file once
+			if self.currentMacro.updateIdentity(): #Forces the macro to ask for a name and update (which saves it)
+				self.clear()
+			else: 
+				self.currentMacro.isBuilt = False
+				self.currentMacro.parentControls = oldControls
 
 	def clear(self): 
 		self.currentMacro = None
-		self.currentSeperator.deleteMe(); self.currentSeperator = None
-		self.executeList=[cmd.deleteMe() for cmd in self.executeList][:0]
-		self.cmdIds.clear()
+		utils.ifDelete(self.currentSeperator); self.currentSeperator = None
+		[fragment.deleteMe() for fragment in self.fragments.values()]
+		self.fragments.clear()
+		self.records.clear()
 		checkQueue()
 
 
@@ -364,12 +1260,54 @@ def enable_cmd_def__created_handler(args: adsk.core.CommandCreatedEventArgs):
 		global currentMacro
 		if currentMacro is None: currentMacro = CommandTracker()
 		else: currentMacro.startTracking() if (not CommandTracker.tracking_) else currentMacro.stopTracking()
-	events_manager_.add_handler(args.command.execute, callback=enable_command_execute_handler)
+	events_manager_.add_handler(args.command.execute, callback=enable_command_execute_handler, owner=args.command)
 
 
 def build_macro_handler(args:adsk.core.CommandCreatedEventArgs):
 	if exists(currentMacro): currentMacro.build()
 
+def export_timings_handler(args:adsk.core.CommandCreatedEventArgs):
+	ui_.messageBox(reportLocation(REPLAY_TIMINGS_PATH, replay_timings_.export(REPLAY_TIMINGS_PATH)), 'AnyMacro Replay Timings')
+
+def export_handler_stats_handler(args:adsk.core.CommandCreatedEventArgs):
+	report = events_manager_.report()
+	isWritten = events_manager_.export(HANDLER_STATS_PATH, report)
+	slowest = sorted(report['sources'].items(), key=lambda item: item[1]['total_ms'], reverse=True)[:10]
+	lines = [f'{report["liveHandlers"]} live handlers, {len(report["leaks"])} outliving their owner', '']
+	lines += [f'Leaked: {leak["source"]} ({leak["owner"]})' for leak in report['leaks'][:10]]
+	if report['profiling']: lines += ['Slowest sources:'] + [f'  {source}: {stats["calls"]} calls, {stats["total_ms"]:.1f} ms total, {stats["max_ms"]:.1f} ms max' for source, stats in slowest if stats['calls']]
+	else: lines.append('Check "Profile Event Handlers" to also measure how long each handler takes.')
+	ui_.messageBox('\n'.join(lines + ['', reportLocation(HANDLER_STATS_PATH, isWritten)]), 'AnyMacro Handler Stats')
+
+def memory_report_handler(args:adsk.core.CommandCreatedEventArgs):
+	report = memoryReport()
+	isWritten = writeReportFile(MEMORY_REPORT_PATH, report)
+	def kb(size:int): return f'{size/1024:.1f} KB'
+	lines = [f'{report["macros"]} macros ({report["loadedMacros"]} with their steps read): {kb(report["macroBytes"])}, {kb(report["unsharedBytes"])} if nothing was shared',
+			f'Registry: {kb(report["registryBytes"])}, search index: {kb(report["searchIndexBytes"])}, recorder: {kb(report["recorderBytes"])}',
+			f'Total: {kb(report["totalBytes"])}', '', 'Largest macros:']
+	lines += [f'  {entry["name"]}: {entry["bytes"]} bytes, {entry["steps"]} steps' for entry in report['largest'][:10]]
+	ui_.messageBox('\n'.join(lines + ['', reportLocation(MEMORY_REPORT_PATH, isWritten)]), 'AnyMacro Memory Report')
+
+def search_macros_handler(args:adsk.core.CommandCreatedEventArgs):
+	allMacros.indexUnreadSteps() #Commands of macros that were never run become searchable once the writer has read them
+	command = args.command
+	command.okButtonText = 'Run'
+	queryInput = command.commandInputs.addStringValueInput('query', 'Search', '')
+	resultsInput = command.commandInputs.addDropDownCommandInput('results', 'Macros', adsk.core.DropDownStyles.TextListDropDownStyle)
+	shownIds: 'list[str]' = []
+	def search_input_changed_handler(args:adsk.core.InputChangedEventArgs):
+		if args.input.id != 'query': return
+		resultsInput.listItems.clear()
+		shownIds[:] = [macro.id for macro in allMacros.search(queryInput.value)]
+		for number, macroId in enumerate(shownIds): resultsInput.listItems.add(allMacros.get(macroId).name, number == 0)
+	def search_execute_handler(args:adsk.core.CommandEventArgs):
+		selected = resultsInput.selectedItem
+		macro = allMacros.get(shownIds[selected.index]) if exists(selected) else None
+		if exists(macro): macro.replay() #Runs it the same way its own command does
+	events_manager_.add_handler(command.inputChanged, callback=search_input_changed_handler, owner=command)
+	events_manager_.add_handler(command.execute, callback=search_execute_handler, owner=command)
+
 def clear_record_handler(args:adsk.core.CommandCreatedEventArgs):
 	if exists(currentMacro): 
 		currentMacro.currentMacro.removeAll()
@@ -390,6 +1328,7 @@ def clear_record_handler(args:adsk.core.CommandCreatedEventArgs):
 @error_catcher_
 def run(context):
 	global app_, ui_, panel_
+	runStart = time.perf_counter()
 	app_,ui_ = AppObjects.GetAppUI()
 	#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 	# Add the command to the tab.
@@ -397,19 +1336,33 @@ def run(context):
 	getDelete(panels,PANEL_ID)
 	panel_ = panels.add(PANEL_ID, NAME)
 	#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+	definition_cache_.load(DEFINITION_CACHE_PATH) #Before anything creates a command
 	add_primary_commands(panel_)
+	replay_dispatcher_.start()
 	update_enable_text()
 	checkQueue()
+	macro_file_.start()
 	jsonToMacros() #Loads the saved macros
 	createAddMacroCustomEvent()
 	createBuiltInCommands()
+	library_validator_.sweep() #After the builtins exist, finished by the save writer
+	log(f'Imported in {IMPORT_TIME*1000:.1f} ms, started in {(time.perf_counter()-runStart)*1000:.1f} ms with {len(allMacros)} macros, '
+		f'{definition_cache_.adopted} command definitions reused and {definition_cache_.created} created{" (development mode)" if DEVELOPMENT_MODE else ""}')
 
 @error_catcher_
 def stop(context):
+	saveProblems = macro_file_.close() #Writes any pending changes before tearing down
+	if saveProblems:
+		log(' '.join(saveProblems))
+		ui_.messageBox('\n'.join(saveProblems), f'{NAME} could not save your macros')
 	removeAddMacroCustomEvent()
 	removeBuiltInCommands()
+	replay_dispatcher_.stop()
 	events_manager_.clean_up()
-	deleteAll(tracking_dropdown_.control, macro_dropdown_.control, panel_)
+	deleteAll(tracking_dropdown_.control, macro_dropdown_.control, diagnostics_dropdown_.control, panel_)
+	macro_menu_.clear()
+	try: definition_cache_.save(DEFINITION_CACHE_PATH) #Only the controls were deleted, the definitions wait for the next run
+	except OSError as saveError: log(f'Could not save the command definition cache: {saveError}')
 
 
 
@@ -427,10 +1380,14 @@ def add_primary_commands(parent:adsk.core.ToolbarPanel):
 	#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 	global halt_cmd_def
 	halt_cmd_def = CommandRef(parent.controls, HALT_CMD_ID, 'Stop current Macro', './resources/noicon', 
-							'Will instantly stop any macro that is running when this command is fired.')
+							f'Stops the macro that is running{" and cancels the queued ones" if HALT_FLUSHES_QUEUE else ", the next queued macro then starts"}.')
 	#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 	global consecutive_block_tgl
 	consecutive_block_tgl = ToggleRef(parent.controls, CONSECUTIVE_TOGGLE_ID, 'Block Consecutive Fires', False)
+	#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+	global diagnostics_dropdown_
+	diagnostics_dropdown_ = DropdownRef(parent.controls, DIAGNOSTICS_DROPDOWN_ID, 'Diagnostics', './resources/noicon')
+	add_diagnostics_dropdown(diagnostics_dropdown_.dropdownControls)
 
 
 
@@ -454,11 +1411,38 @@ def add_record_dropdown(parent:adsk.core.ToolbarControls):
 	parent.addSeparator(f'{ENABLE_CMD_DEF_ID}_Seperator')#|||||||||||||||||||||||||||||||||||||||||||||||||||||||
 
 
+def add_diagnostics_dropdown(parent:adsk.core.ToolbarControls):
+	#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+	global replay_timing_tgl
+	replay_timing_tgl = ToggleRef(parent, REPLAY_TIMING_TOGGLE_ID, 'Record Replay Timings', False, 
+								'Measures how long each step of a running macro takes.')
+	export_timings_cmd = CommandRef(parent, EXPORT_TIMINGS_CMD_ID, 'Export Replay Timings', './resources/save',
+								f'Writes the recorded timings to {path.basename(REPLAY_TIMINGS_PATH)} in the add-in folder.')
+	events_manager_.add_handler(event=export_timings_cmd.commandCreated, callback=export_timings_handler)
+	memory_report_cmd = CommandRef(parent, MEMORY_REPORT_CMD_ID, 'Memory Report', './resources/noicon',
+								f'Shows how much memory each macro uses and writes the details to {path.basename(MEMORY_REPORT_PATH)}.')
+	events_manager_.add_handler(event=memory_report_cmd.commandCreated, callback=memory_report_handler)
+	#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+	global profile_handlers_tgl
+	profile_handlers_tgl = ToggleRef(parent, PROFILE_HANDLERS_TOGGLE_ID, 'Profile Event Handlers', False,
+								'Measures how long every event handler of the add-in takes.')
+	events_manager_.add_handler(event=profile_handlers_tgl.definition.commandCreated, callback=lambda args: events_manager_.setEnabled(profile_handlers_tgl.value), source='HandlerProfiler.setEnabled')
+	export_handler_stats_cmd = CommandRef(parent, EXPORT_HANDLER_STATS_CMD_ID, 'Handler Stats', './resources/save',
+								f'Shows live, leaked and slowest event handlers and writes them to {path.basename(HANDLER_STATS_PATH)} in the add-in folder.')
+	events_manager_.add_handler(event=export_handler_stats_cmd.commandCreated, callback=export_handler_stats_handler)
+
+
 def add_macro_dropdown(parent:adsk.core.ToolbarControls):
 	#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 	global macro_dropdown_empty
 	macro_dropdown_empty = CommandRef(parent, NO_MACROS_ID, 'All Custom Macros', './resources/noicon', 
 									'Start by recording a new macro and saving it')
+	import_macros_cmd = CommandRef(parent, IMPORT_MACROS_CMD_ID, 'Import Macros...', './resources/allmacros',
+									'Adds or updates macros from a JSON array or newline delimited JSON file.')
+	events_manager_.add_handler(event=import_macros_cmd.commandCreated, callback=import_macros_handler)
+	search_macros_cmd = CommandRef(parent, SEARCH_MACROS_CMD_ID, 'Search Macros...', './resources/allmacros',
+									'Finds macros by name or by the commands they run, and runs the selected one.')
+	events_manager_.add_handler(event=search_macros_cmd.commandCreated, callback=search_macros_handler)
 	#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 	getDelete(parent, f'{NO_MACROS_ID}_Seperator')
 	parent.addSeparator(f'{NO_MACROS_ID}_Seperator')#|||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
@@ -481,17 +1465,371 @@ def add_macro_dropdown(parent:adsk.core.ToolbarControls):
 #|||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
 #json data
 
-def jsonToMacros():	Macro.fromList(settings.readDataFromFile(MACRO_FILE_DATA_PATH,True))
-def macrosToJson():	settings.writeDataToFile(MACRO_FILE_DATA_PATH,Macro.toList(),True)
+def writeFileAtomic(filePath:str, data:bytes):
+	tempPath = f'{filePath}.tmp'
+	with open(tempPath, 'wb') as file:
+		file.write(data)
+		file.flush(); os.fsync(file.fileno())
+	os.replace(tempPath, filePath) #The old file stays intact until the new one is fully on disk
+def writeJsonAtomic(filePath:str, data): writeFileAtomic(filePath, json.dumps(data, indent=2).encode('utf-8'))
+def writeReportFile(filePath:str, report:dict) -> bool: #Diagnostic reports, a failed write is logged instead of raised
+	try: writeJsonAtomic(filePath, report); return True
+	except OSError as writeError: log(f'Could not write {path.basename(filePath)}: {writeError}'); return False
+def reportLocation(filePath:str, isWritten:bool): return f'Full report written to:\n{filePath}' if isWritten else 'The full report could not be written, see the Text Commands window.'
+
+def shardFileName(category:str=None): return f'{MACRO_SHARD_PREFIX}{utils.toIdentifier(category)}.json' if category else path.basename(MACRO_FILE_DATA_PATH)
+
+
+# The library is split into one shard file per category, each holding a JSON array with one macro per line.
+# The index stores the names, ids and byte ranges of every entry, so startup never parses the steps themselves.
+# A shard whose size or modified time no longer matches the index (edited by hand, copied in) is parsed in full and rewritten.
+# Edits are appended to a journal as single line records and folded into the shards once it grows too large.
+# A torn final record (crash mid-write) fails to parse and is dropped along with anything after it.
+# All writes happen on a background thread from snapshots taken on the UI thread, results come back through a custom event.
+class MacroSaveFile:
+	def __init__(self, dataPath:str, journalPath:str, indexPath:str):
+		self.dataPath = dataPath
+		self.journalPath = journalPath
+		self.indexPath = indexPath
+		self.shards: 'dict[str,dict]' = {} #Shard file -> index entry (category, size, mtime, macros), None until it has been indexed
+		self.journalSize = 0
+		self.pendingRecords: 'list[str]' = []
+		self.isDirty = False #Set when the shards must be compacted instead of journaled
+		self.isLoading = False
+		self.holdCount = 0 #While above zero, saves are only collected and written once the last hold is released
+		self.isCompacting = False #A snapshot is queued or being written, the next one waits for its results
+		self.writeCount = 0
+		self.errors: 'deque[dict]' = deque(maxlen=20)
+		self.jobs: 'deque[tuple]' = deque()
+		self.results: 'list[tuple]' = []
+		self.jobsChanged = threading.Condition()
+		self.isWriting = self.isClosing = False
+		self.writer:threading.Thread = None
+		self.completeInfo = None
+
+	def record(self, op:str, **fields):
+		if self.isLoading: return
+		self.pendingRecords.append(json.dumps(dict(op=op, **fields), separators=(',',':')))
+		if self.holdCount == 0: self.flush()
+
+	@contextmanager
+	def deferred(self):
+		self.holdCount += 1
+		try: yield self
+		finally:
+			self.holdCount -= 1
+			if self.holdCount == 0: self.flush()
+
+	def flush(self):
+		if (self.isDirty or self.journalSize >= JOURNAL_COMPACT_SIZE) and not self.isCompacting: return self.compact()
+		if not self.pendingRecords: return False
+		data = ''.join(f'{line}\n' for line in self.pendingRecords)
+		self.pendingRecords.clear()
+		self.journalSize += len(data.encode('utf-8'))
+		self.queue('append', data)
+		return True
+
+	def compact(self): #Only shards whose entries changed are rewritten, unread entries are copied byte for byte by the writer
+		self.isDirty = False
+		self.isCompacting = True
+		self.pendingRecords.clear()
+		self.journalSize = 0
+		isQueued = False
+		try:
+			shardMacros: 'dict[str,list[Macro]]' = {fileName:[] for fileName in self.shards}
+			for macro in allMacros:
+				if macro.isBuilt and macro.name: shardMacros.setdefault(shardFileName(macro.category), []).append(macro)
+			rewrites = []
+			for fileName, macros in shardMacros.items():
+				shard = self.shards.get(fileName)
+				if exists(shard) and [entry[0] for entry in shard['macros']] == [macro.id for macro in macros] and all(exists(macro.source) for macro in macros): continue
+				rewrites.append((fileName, macros[0].category if macros else None,
+								[(macro, (macro.id, macro.name, macro.repeat), macro.source, macro._executeList, None if macro._executeList is None else macro.toJsonLine()) for macro in macros]))
+			self.queue('compact', (dict(self.shards), rewrites))
+			isQueued = True
+		finally:
+			if not isQueued: self.isCompacting, self.isDirty = False, True #The next save tries again instead of waiting on a snapshot that never comes
+		return True
+	#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+	def start(self):
+		if exists(self.completeInfo): return
+		self.completeInfo = events_manager_.add_handler(utils.CustomEvents.Create(SAVE_COMPLETE_EVENT_ID), lambda args: self.applyResults(), source='MacroSaveFile.applyResults')
+
+	def queue(self, kind:str, payload):
+		with self.jobsChanged:
+			self.jobs.append((kind, payload))
+			self.jobsChanged.notify_all()
+		if self.writer is None or not self.writer.is_alive():
+			self.isClosing = False
+			self.writer = threading.Thread(target=self.writeLoop, name=SAVE_COMPLETE_EVENT_ID, daemon=True)
+			self.writer.start()
+
+	def writeLoop(self):
+		while True:
+			with self.jobsChanged:
+				while not self.jobs and not self.isClosing: self.jobsChanged.wait()
+				if not self.jobs: return
+				jobs, self.isWriting = list(self.jobs), True
+				self.jobs.clear()
+			results = self.runJobs(jobs)
+			with self.jobsChanged:
+				self.results.extend(results)
+				self.isWriting = False
+				self.jobsChanged.notify_all()
+			if not self.isClosing: app_.fireCustomEvent(SAVE_COMPLETE_EVENT_ID)
+
+	def runJobs(self, jobs:'list[tuple]') -> 'list[tuple]':
+		reads = [payload for kind, payload in jobs if kind == 'read']
+		jobs = [(kind, payload) for kind, payload in jobs if kind != 'read']
+		results = [('read', callback, self.readEntries(entries)) for callback, entries in reads] #Before any snapshot replaces the shards they point into
+		lastSnapshot = max((number for number, (kind, _) in enumerate(jobs) if kind == 'compact'), default=0)
+		jobs = jobs[lastSnapshot:] #Journal records queued before a snapshot are already part of it
+		journalData = ''
+		for kind, payload in jobs:
+			if kind == 'append': journalData += payload; continue
+			try: results.append(('compacted', *self.writeSnapshot(*payload)))
+			except Exception as error: results.append(('failed', 'compact', repr(error)))
+		if journalData:
+			try:
+				with open(self.journalPath, 'a', encoding='utf-8') as file:
+					file.write(journalData)
+					file.flush(); os.fsync(file.fileno())
+				results.append(('appended',))
+			except Exception as error: results.append(('failed', 'append', repr(error)))
+		return results
+
+	def writeSnapshot(self, shards:'dict[str,dict]', rewrites:list): #Runs on the writer thread, touches nothing but its snapshot
+		updates = []
+		for fileName, category, entries in rewrites:
+			filePath = path.join(self.dataPath, fileName)
+			if not entries and fileName != shardFileName():
+				if path.exists(filePath): os.remove(filePath)
+				shards.pop(fileName, None)
+				continue
+			data, ranges = bytearray(b'['), []
+			for _, _, source, _, line in entries:
+				if line is None: line = self.readRaw(source) #Read before the old shard is replaced
+				data += b'\n' if len(ranges) == 0 else b',\n'
+				ranges.append((len(data), len(line)))
+				data += line
+			data += b'\n]\n'
+			writeFileAtomic(filePath, bytes(data))
+			stat = os.stat(filePath)
+			shards[fileName] = dict(category=category, size=stat.st_size, mtime=stat.st_mtime_ns,
+										macros=[[macroId, name, offset, length, *([repeat] if repeat != 1 else [])] for (_, (macroId, name, repeat), _, _, _), (offset, length) in zip(entries, ranges)])
+			updates += [(macro, source, steps, (fileName, offset, length)) for (macro, _, source, steps, _), (offset, length) in zip(entries, ranges)]
+		writeFileAtomic(self.indexPath, json.dumps(dict(version=1, shards=shards), separators=(',',':')).encode('utf-8'))
+		open(self.journalPath, 'w').close() #Replaying the old journal over the new shards would be harmless, so this needs no ordering guarantees
+		return shards, updates
+
+	def readEntries(self, entries:'list[tuple]') -> 'dict[str,list]': #Writer thread, each shard is read once however many of its entries are asked for
+		files: 'dict[str,bytes]' = {}
+		steps = {}
+		for macroId, (fileName, offset, length) in entries:
+			try:
+				if fileName not in files:
+					with open(path.join(self.dataPath, fileName), 'rb') as file: files[fileName] = file.read()
+				macroDict = json.loads(files[fileName][offset:offset+length])
+				steps[macroId] = macroDict['executeList'] if macroDict.get('id') == macroId else None
+			except (OSError, ValueError, KeyError): steps[macroId] = None #Checked when it is first run instead
+		return steps
+
+	def applyResults(self): #UI thread only
+		with self.jobsChanged: results, self.results = self.results, []
+		compacted = False
+		for result in results:
+			if result[0] == 'read': result[1](result[2]); continue
+			self.writeCount += 1
+			if result[0] == 'compacted':
+				self.shards, updates = result[1:]
+				for macro, source, steps, newSource in updates:
+					if macro.source is source and macro._executeList is steps: macro.source = newSource #Skipped if edited since the snapshot
+				self.isCompacting, compacted = False, True
+			elif result[0] == 'failed':
+				self.errors.append(dict(kind=result[1], error=result[2], time=time.strftime('%H:%M:%S')))
+				log(f'Saving macros failed ({result[1]}): {result[2]}')
+				if result[1] == 'compact': self.isCompacting = False
+				self.isDirty = True #The next save rewrites everything from memory
+		if compacted and self.isDirty and self.holdCount == 0: self.flush() #Saves that waited on the snapshot
+
+	def drain(self, timeout:float=None) -> bool: #Waits for the writer, including any saves queued by the results it returns
+		deadline = None if timeout is None else time.monotonic() + timeout
+		while True:
+			with self.jobsChanged:
+				while self.jobs or self.isWriting:
+					remaining = None if deadline is None else deadline - time.monotonic()
+					if remaining is not None and remaining <= 0: break
+					self.jobsChanged.wait(remaining)
+				isIdle = not (self.jobs or self.isWriting)
+			self.applyResults()
+			if not isIdle or not self.jobs: return isIdle
+
+	def close(self, timeout:float=SAVE_FLUSH_TIMEOUT) -> 'list[str]': #Returns the problems worth telling the user about
+		self.flush()
+		isIdle = self.drain(timeout)
+		if isIdle and self.isDirty: self.flush(); isIdle = self.drain(timeout) #Retries once after a failed write
+		with self.jobsChanged:
+			self.isClosing = True
+			self.jobsChanged.notify_all()
+		if exists(self.completeInfo):
+			self.completeInfo.remove(); self.completeInfo = None
+			utils.CustomEvents.Remove(SAVE_COMPLETE_EVENT_ID)
+		problems = [f'Writing the macro library failed: {self.errors[-1]["error"]}'] if self.isDirty and self.errors else []
+		if not isIdle: problems.append(f'Saving did not finish within {timeout:g} seconds')
+		return problems
+	#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+	def shardFiles(self):
+		fileNames = sorted(name for name in os.listdir(self.dataPath) if name.startswith(MACRO_SHARD_PREFIX) and name.endswith('.json'))
+		return ([shardFileName()] if path.exists(path.join(self.dataPath, shardFileName())) else []) + fileNames
+
+	def readIndex(self) -> 'dict[str,dict]':
+		try: index = settings.readDataFromFile(self.indexPath,True) if path.exists(self.indexPath) else {}
+		except ValueError: index = {} #Rebuilt from the shards
+		return index.get('shards', {}) if isinstance(index, dict) and index.get('version') == 1 else {}
+
+	def load(self) -> 'list[dict]': #Index entries only carry a source, the steps are read by Macro.executeList when needed
+		self.drain()
+		index = self.readIndex()
+		self.shards = {}
+		macros: 'dict[str,dict]' = {}
+		for fileName in self.shardFiles():
+			shard, stat = index.get(fileName), os.stat(path.join(self.dataPath, fileName))
+			if exists(shard) and shard.get('size') == stat.st_size and shard.get('mtime') == stat.st_mtime_ns:
+				self.shards[fileName] = shard
+				entries = [dict(id=macroId, name=name, category=shard['category'], source=(fileName, offset, length), repeat=repeat[0] if repeat else 1)
+							for macroId, name, offset, length, *repeat in shard['macros']]
+			else:
+				category = fileName[len(MACRO_SHARD_PREFIX):-len('.json')] if fileName.startswith(MACRO_SHARD_PREFIX) else None
+				entries = [{'category':category, **macroDict} for macroDict in settings.readDataFromFile(path.join(self.dataPath, fileName),True)]
+				self.shards[fileName] = None #Rewritten (or removed once empty) by the next compaction
+				self.isDirty = True
+			for macroDict in entries:
+				if macroDict['id'] in macros: self.isDirty = True #Duplicate ids resolve to the last entry
+				macros[macroDict['id']] = macroDict
+		if path.exists(self.journalPath):
+			with open(self.journalPath, 'r', encoding='utf-8') as file: data = file.read()
+			self.journalSize = len(data.encode('utf-8'))
+			if not self.replay(macros, data): self.isDirty = True #Rewrites the library so the torn record is gone
+		return list(macros.values())
+
+	def readRaw(self, source:tuple) -> bytes:
+		fileName, offset, length = source
+		with open(path.join(self.dataPath, fileName), 'rb') as file:
+			file.seek(offset)
+			return file.read(length)
+
+	def readSteps(self, source:tuple, macroId:str) -> list:
+		try:
+			macroDict = json.loads(self.readRaw(source))
+			if macroDict.get('id') == macroId: return macroDict['executeList']
+		except (OSError, ValueError, KeyError): pass
+		log(f'{source[0]} changed since it was indexed, searching it for "{macroId}"') #Only if the file was edited while running
+		filePath = path.join(self.dataPath, source[0])
+		savedList = settings.readDataFromFile(filePath,True) if path.exists(filePath) else []
+		return next((macroDict['executeList'] for macroDict in reversed(savedList) if macroDict.get('id') == macroId), [])
+
+	@staticmethod
+	def replay(macros:'dict[str,dict]', data:str):
+		complete, _, torn = data.rpartition('\n')
+		for line in complete.split('\n') if complete else ():
+			try: record:dict = json.loads(line)
+			except ValueError: return False
+			op = record.get('op')
+			if op in ('add','rename') and macroDictProblem(record.get('macro')): continue #Written before imports were validated as strictly
+			if op == 'add': macros[record['macro']['id']] = record['macro']
+			elif op == 'rename': macros.pop(record['id'], None); macros[record['macro']['id']] = record['macro']
+			elif op == 'delete': macros.pop(record['id'], None)
+			elif op == 'steps' and record['id'] in macros: macros[record['id']] = dict(macros[record['id']], executeList=record['executeList'])
+		return torn == ''
+
+	@contextmanager
+	def loading(self):
+		self.isLoading = True
+		try: yield self
+		finally: self.isLoading = False
+
+macro_file_ = MacroSaveFile(MACRO_DATA_PATH, MACRO_JOURNAL_PATH, MACRO_INDEX_PATH)
+
+def jsonToMacros():
+	macroList = macro_file_.load()
+	macro_menu_.configure(len(macroList))
+	with macro_file_.deferred(), macro_file_.loading(): Macro.fromList(macroList)
 
 # Custom event so other addins can create macros
 #|||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
 
-add_macro_event_Handler:events.LinkedHandler = None
+MACRO_ID_PATTERN = re.compile(r'^[A-Za-z0-9_]+$')
+
+def parseMacroPayload(payload:'str|list|dict') -> list: #A JSON array, a single JSON object or newline delimited JSON
+	if isinstance(payload, (list,dict)): entries = payload
+	else:
+		try: entries = json.loads(payload)
+		except ValueError:
+			def parseLine(line:str):
+				try: return json.loads(line)
+				except ValueError: return None
+			entries = [parseLine(line) for line in payload.splitlines() if line.strip()]
+	return entries if isinstance(entries, list) else [entries]
+
+def macroDictProblem(macroDict:dict):
+	if not isinstance(macroDict, dict): return 'not a JSON object'
+	name, macroId, executeList = (macroDict.get(key) for key in ('name','id','executeList'))
+	if not isinstance(name, str) or not name: return 'missing name'
+	if not isinstance(macroId, str) or not MACRO_ID_PATTERN.match(macroId): return 'id must only use A-z, 0-9 and _'
+	if not isinstance(executeList, list) or not all(isinstance(cmdId, str) for cmdId in executeList): return 'executeList must be a list of command ids'
+	repeat = macroDict.get('repeat', 1)
+	if type(repeat) is not int or repeat < 0: return 'repeat must be a whole number of runs (0 repeats until halted)'
+	category = macroDict.get('category')
+	if category is not None and (not isinstance(category, str) or not category): return 'category must be a non-empty string'
+	return None
+
+# Validates everything first, then applies the changes with a single save and a single menu update.
+def importMacros(payload:'str|list|dict') -> dict:
+	summary = dict(added=[], updated=[], unchanged=[], invalid=[], duplicates=0, cycles=[], broken=[])
+	macroDicts: 'dict[str,dict]' = {}
+	for index, entry in enumerate(parseMacroPayload(payload)):
+		problem = macroDictProblem(entry)
+		if problem: summary['invalid'].append(dict(index=index, reason=problem)); continue
+		if entry['id'] in macroDicts: summary['duplicates'] += 1 #The last entry wins, like when loading
+		macroDicts[entry['id']] = dict(entry)
+
+	with macro_file_.deferred(), macro_menu_.suspended():
+		for macroId, macroDict in macroDicts.items():
+			existing = allMacros.get(macroId)
+			isSaved = exists(existing) and existing.isBuilt
+			if isSaved and existing.toDict() == macroDict: summary['unchanged'].append(macroId); continue
+			summary['updated' if isSaved else 'added'].append(macroId)
+			Macro.fromDict(macroDict)
+	for macroId in summary['added'] + summary['updated']: #Saved anyway, they only refuse to run until the loop is broken
+		try: allMacros.get(macroId).plan
+		except MacroCycleError as cycle: summary['cycles'].append(dict(id=macroId, cycle=str(cycle)))
+	checked = library_validator_.sweep([allMacros.get(macroId) for macroId in summary['added'] + summary['updated']])
+	summary['broken'] = [dict(id=macroId, missing=list(missing)) for macroId, missing in checked.items() if missing]
+	return summary
+
+def summaryText(summary:dict):
+	lines = [f'{len(summary[key])} {key}' for key in ('added','updated','unchanged','invalid')]
+	if summary['duplicates']: lines.append(f'{summary["duplicates"]} duplicate ids (last entry kept)')
+	lines += [f'{cycle["id"]} includes itself: {cycle["cycle"]}' for cycle in summary['cycles'][:10]]
+	lines += [f'{broken["id"]} uses missing commands: {", ".join(broken["missing"])}' for broken in summary['broken'][:10]]
+	lines += [f'Entry {problem["index"]}: {problem["reason"]}' for problem in summary['invalid'][:10]]
+	return '\n'.join(lines)
+
+def import_macros_handler(args:adsk.core.CommandCreatedEventArgs):
+	dialog = ui_.createFileDialog()
+	dialog.title = 'Import Macros'
+	dialog.filter = 'Macro files (*.json *.ndjson *.jsonl);;All files (*.*)'
+	if dialog.showOpen() != adsk.core.DialogResults.DialogOK: return
+	with open(dialog.filename, 'r', encoding='utf-8') as file: summary = importMacros(file.read())
+	ui_.messageBox(summaryText(summary), 'AnyMacro Import')
+
+add_macro_event_Handler:ProfiledHandler = None
 def createAddMacroCustomEvent():
 	global add_macro_event, add_macro_event_Handler
 	def AddMacroEventHandler(args:adsk.core.CustomEventArgs):
-		Macro.fromJson(args.additionalInfo)
+		summary = importMacros(args.additionalInfo)
+		log(f'Imported macros from {ADD_MACRO_CUSTOM_ID}: {summaryText(summary)}'.replace('\n', ', '))
+		app_.fireCustomEvent(ADD_MACRO_RESULT_ID, json.dumps(summary)) #Only delivered if the sender registered the event
 
 	add_macro_event = utils.CustomEvents.Create(ADD_MACRO_CUSTOM_ID)
 	add_macro_event_Handler = events_manager_.add_handler(add_macro_event,AddMacroEventHandler)
@@ -515,122 +1853,28 @@ def removeAddMacroCustomEvent():
 
 
 
-class ViewCube:
-	class Direction:
-		@classmethod
-		def NewDir(cls, UpDown=0,LeftRight=0,FrontBack=0):
-			Yup,Zup = (LeftRight,UpDown,FrontBack), (LeftRight,FrontBack,UpDown)
-			negYup,negZup = [-val for val in Yup], [-val for val in Zup]
-			return cls(Yup,Zup), cls(negYup,negZup)
-
-		YAxisUp =  adsk.core.DefaultModelingOrientations.YUpModelingOrientation
-		ZAxisUp =  adsk.core.DefaultModelingOrientations.ZUpModelingOrientation
-		def GetCurrentOrientation(self): return app_.preferences.generalPreferences.defaultModelingOrientation
-
-		def __init__(self, Yup,Zup): self.direction = {self.YAxisUp:Yup, self.ZAxisUp:Zup}.get
-		def __get__(self,instance,owner):
-			return adsk.core.Vector3D.create(*self.direction(self.GetCurrentOrientation()))
-		def __set__(self,instance,value): return False
-
-		
-	
-	def CombinedView(*directions:adsk.core.Vector3D):
-		SUMVEC :adsk.core.Vector3D = adsk.core.Vector3D.create(0,0,0)
-		for dir in directions: SUMVEC.add(dir)
-		return SUMVEC if SUMVEC.length != 0 and SUMVEC.normalize() else ViewCube.Front
-
-	Top, Bottom= Direction.NewDir(UpDown=1)
-	Left, Right= Direction.NewDir(LeftRight=-1)
-	Front, Back= Direction.NewDir(FrontBack=-1)
-
-	def GetOrientationsUp(orientation:adsk.core.Vector3D):
-		def vectorTuple(vec:adsk.core.Vector3D):return vec.x,vec.y,vec.z
-		return {vectorTuple(ViewCube.Top):ViewCube.Front, vectorTuple(ViewCube.Bottom):ViewCube.Back}.get(vectorTuple(orientation), ViewCube.Top)
-
-
-def TryViewOrientation(args, orientation=None, localView = True):
-	# ui_.messageBox(str(ViewCube.CombinedView(ViewCube.Front,ViewCube.Left).asArray()))
-	# ui_.messageBox(str(ViewCube.CombinedView(ViewCube.Front,ViewCube.Back).asArray()))
-	# ui_.messageBox(str(ViewCube.CombinedView(ViewCube.Front,ViewCube.Left, ViewCube.Top).asArray()))
-
-	camera = utils.camera.get()
-	eyeVector= utils.camera.viewDirection(camera)
-
-	orientation = ViewCube.Front
-	upDirection = ViewCube.GetOrientationsUp(orientation)
-	# ui_.messageBox(str(upDirection.asArray()))
-
-	orientation.scaleBy(eyeVector.length)
-	newEye = camera.target.copy()
-	newEye.translateBy(orientation)
-
-	camera.upVector = upDirection
-	camera.eye = newEye
-
-	utils.camera.updateCamera(camera)
-	utils.doEvents()
-	# ui_.messageBox(str((ViewCube.Front.asArray(),ViewCube.Top.asArray())))
-	# ui_.messageBox(str((str(utils.camera.get().eye.asArray()),str(utils.camera.get().target.asArray()), str(utils.camera.get().upVector.asArray()))))
-
-
-
-
-
-
-
-
-
-
-
 #Built in commands for built in macros
-	
 #|||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
 
-def reAssignCamera(cameraCopy:adsk.core.Camera):
-	utils.camera.updateCamera(cameraCopy,True)
-	ui_.activeSelections.clear()
-
-def getLineDirection(prompt):
-	try: line = ui_.selectEntity(prompt,'LinearEdges,SketchLines,ConstructionLines')
-	except: return None
-	if line: return geometry.lines.getDirection(line.entity)
-
-def viewCommandSetup(cmd: adsk.core.Command): cmd.isRepeatable=cmd.isExecutedWhenPreEmpted=False
-
-#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-def alignViewHandler(args: adsk.core.CommandCreatedEventArgs):
-	viewCommandSetup(args.command)
-	lineDirection = getLineDirection('Please select a line represinting the "up" direction')
-	if not lineDirection: return
-	camera_copy = utils.camera.get()
-	upDirection = camera_copy.upVector.copy()
-
-	orintatedVector = geometry.vectors.project(upDirection,lineDirection,True)
-
-	camera_copy.upVector = orintatedVector
-	reAssignCamera(camera_copy)
-
-
-def changeViewAxis(args: adsk.core.CommandCreatedEventArgs):
-	viewCommandSetup(args.command)
-	lineDirection = getLineDirection('Please select a line represinting the "forwards" direction')
-	if not lineDirection: return
-	camera_copy = utils.camera.get()
-	cameraDirection = utils.camera.viewDirection(camera_copy)
-
-	if cameraDirection.isPerpendicularTo(lineDirection):#Prevents perpendicular angles from failing
-		orintatedVector = geometry.vectors.normalOf(lineDirection)
-		if camera_copy.upVector.isParallelTo(lineDirection):
-			camera_copy.upVector = geometry.vectors.normalOf(cameraDirection)
-	else: orintatedVector = geometry.vectors.project(cameraDirection,lineDirection,True)
-	orintatedVector.scaleBy(cameraDirection.length)
-
-	newEye = camera_copy.target.asVector()
-	newEye.subtract(orintatedVector)
-	camera_copy.eye = newEye.asPoint()
-	reAssignCamera(camera_copy)
-
-
+camera_commands_ = None
+def cameraCommands():
+	global camera_commands_
+	if camera_commands_ is None:
+		loadStart = time.perf_counter()
+		from .AddinLib import geometry
+		from . import CameraCommands
+		if DEVELOPMENT_MODE: utils.ReImport_List(geometry, CameraCommands)
+		camera_commands_ = CameraCommands
+		log(f'Loaded camera commands in {(time.perf_counter()-loadStart)*1000:.1f} ms')
+	return camera_commands_
+
+def releaseCamera(): #Applies the camera a stopped macro left pending
+	if exists(camera_commands_): camera_commands_.CameraTransaction.release()
+
+def cameraHandler(handlerName:str): #The camera module is only imported once one of its commands is first created
+	def lazyHandler(args:adsk.core.CommandCreatedEventArgs): getattr(cameraCommands(), handlerName)(args)
+	lazyHandler.__qualname__ = f'CameraCommands.{handlerName}' #Keeps the three builtins apart in the handler stats
+	return lazyHandler
 
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 def createBuiltInCommands():
@@ -640,19 +1884,19 @@ def createBuiltInCommands():
 			'zxynine_anymacro_BuiltinAlignView',
 			'Change Cameras Up',
 			'./resources/BuiltinIcons/CameraUp','')
-	events_manager_.add_handler(AlignView.commandCreated, alignViewHandler)
+	events_manager_.add_handler(AlignView.commandCreated, cameraHandler('alignViewHandler'))
 
 	ChangeView= CommandRef(inspectPanel.controls,
 			'zxynine_anymacro_BuiltinChangeView',
 			'Change Cameras Forwards',
 			'./resources/BuiltinIcons/CameraForward','')
-	events_manager_.add_handler(ChangeView.commandCreated, changeViewAxis)
+	events_manager_.add_handler(ChangeView.commandCreated, cameraHandler('changeViewAxis'))
 	
 	ChangeView= CommandRef(inspectPanel.controls,
 			'zxynine_anymacro_BuiltinChangeViewOrientation',
 			'Change Cameras View Orientation',
 			'./resources/save','')
-	events_manager_.add_handler(ChangeView.definition.commandCreated, TryViewOrientation)
+	events_manager_.add_handler(ChangeView.definition.commandCreated, cameraHandler('TryViewOrientation'))
 
 
 def removeBuiltInCommands():
@@ -660,6 +1904,7 @@ def removeBuiltInCommands():
 	getDelete(inspectPanel.controls,'zxynine_anymacro_BuiltinAlignView')
 	getDelete(inspectPanel.controls,'zxynine_anymacro_BuiltinChangeView')
 	getDelete(inspectPanel.controls,'zxynine_anymacro_BuiltinChangeViewOrientation')
-	getDelete(ui_.commandDefinitions,'zxynine_anymacro_BuiltinChangeViewOrientation')
-	getDelete(ui_.commandDefinitions,'zxynine_anymacro_BuiltinAlignView')
-	getDelete(ui_.commandDefinitions,'zxynine_anymacro_BuiltinChangeView')
\ No newline at end of file
+	#The definitions are kept for the next run, like every other definition of the add-in
+
+
+IMPORT_TIME = time.perf_counter() - IMPORT_START
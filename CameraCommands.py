@@ -0,0 +1,191 @@
+# This file is part of AnyMacro, a Fusion 360 add-in for assigning
+# macros from last run commands.
+#
+# Copyright (c) 2021 ZXYNINE
+# 
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+# 
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+# 
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import adsk.core, adsk.fusion
+import math, itertools
+
+# Imported the first time a builtin camera command is created, so add-in startup never pays for it.
+from .AddinLib import utils, geometry, AppObjects
+app_, ui_ = AppObjects.GetAppUI()
+
+
+# Every view of the cube is made of at most one of Top/Bottom, Front/Back and Left/Right: 6 faces, 12 edges and 8 corners.
+# Both modeling orientations are tabulated once as plain tuples, so resolving a view never touches the API.
+VIEW_COMPONENTS = ((('',0),('Top',1),('Bottom',-1)), (('',0),('Front',-1),('Back',1)), (('',0),('Left',-1),('Right',1)))
+
+def buildViewTable(isYUp:bool) -> 'dict[str,tuple[tuple,tuple]]': #View name -> (eye direction from the target, up vector)
+	def axes(UpDown=0,FrontBack=0,LeftRight=0): return (LeftRight,UpDown,FrontBack) if isYUp else (LeftRight,FrontBack,UpDown)
+	def normalized(vector): length = math.sqrt(sum(val*val for val in vector)); return tuple(val/length for val in vector)
+	table = {}
+	for (upName,UpDown),(frontName,FrontBack),(sideName,LeftRight) in itertools.product(*VIEW_COMPONENTS):
+		name = upName+frontName+sideName
+		if not name: continue
+		up = {'Top':axes(FrontBack=-1), 'Bottom':axes(FrontBack=1)}.get(name, axes(UpDown=1)) #Looking straight down the up axis needs another up
+		table[name] = (normalized(axes(UpDown,FrontBack,LeftRight)), up)
+	return table
+
+def vectorKey(vector:tuple): return tuple(round(val, 6) for val in vector)
+
+
+class ViewCube:
+	YAxisUp =  adsk.core.DefaultModelingOrientations.YUpModelingOrientation
+	ZAxisUp =  adsk.core.DefaultModelingOrientations.ZUpModelingOrientation
+	Tables = {YAxisUp:buildViewTable(True), ZAxisUp:buildViewTable(False)}
+
+	orientation = None
+	table: 'dict[str,tuple[tuple,tuple]]' = None
+	names: 'dict[tuple,str]' = None
+	@classmethod
+	def Refresh(cls): #The only preference read, the cached table is swapped only when the preference changed
+		orientation = app_.preferences.generalPreferences.defaultModelingOrientation
+		if cls.table is None or orientation != cls.orientation:
+			cls.orientation, cls.table = orientation, cls.Tables.get(orientation, cls.Tables[cls.YAxisUp])
+			cls.names = {vectorKey(direction):name for name,(direction,_) in cls.table.items()}
+		return cls.table
+	@classmethod
+	def View(cls, name:str): return (cls.table or cls.Refresh())[name]
+	@classmethod
+	def Vector(cls, name:str): return adsk.core.Vector3D.create(*cls.View(name)[0])
+	@classmethod
+	def NameOf(cls, direction:adsk.core.Vector3D):
+		if cls.table is None: cls.Refresh()
+		return cls.names.get(vectorKey(direction.asArray()))
+
+	class Direction:
+		def __init__(self, name): self.name = name
+		def __get__(self,instance,owner): return ViewCube.Vector(self.name)
+		def __set__(self,instance,value): return False
+
+	Top, Bottom= Direction('Top'), Direction('Bottom')
+	Left, Right= Direction('Left'), Direction('Right')
+	Front, Back= Direction('Front'), Direction('Back')
+
+	def CombinedView(*directions:adsk.core.Vector3D):
+		summed = [sum(vals) for vals in zip(*(dir.asArray() for dir in directions))] or [0,0,0]
+		length = math.sqrt(sum(val*val for val in summed))
+		return adsk.core.Vector3D.create(*(val/length for val in summed)) if length != 0 else ViewCube.Front
+
+	def GetOrientationsUp(orientation:adsk.core.Vector3D):
+		return adsk.core.Vector3D.create(*ViewCube.View(ViewCube.NameOf(orientation) or 'Front')[1])
+
+
+# Consecutive camera steps of a running macro share one camera copy and only the last of them updates the viewport.
+# The replay dispatcher holds the transaction while the next step of the macro is another camera command.
+class CameraTransaction:
+	pending:adsk.core.Camera = None
+	isHeld = False
+	smoothTransition = False
+	clearSelections = False
+	commitCount = 0
+
+	@classmethod
+	def get(cls) -> adsk.core.Camera: return cls.pending or utils.camera.get()
+	@classmethod
+	def apply(cls, camera:adsk.core.Camera=None, smoothTransition=False, clearSelections=False): #Without a camera, only commits what earlier steps left
+		if camera is not None: cls.pending, cls.smoothTransition = camera, smoothTransition
+		cls.clearSelections |= clearSelections
+		return False if cls.isHeld else cls.commit()
+	@classmethod
+	def release(cls): #The macro stopped before its last camera step
+		cls.isHeld = False
+		return cls.commit()
+	@classmethod
+	def commit(cls):
+		camera, cls.pending = cls.pending, None
+		clearSelections, cls.clearSelections = cls.clearSelections, False
+		if clearSelections: ui_.activeSelections.clear()
+		if camera is None: return False
+		utils.camera.updateCamera(camera, cls.smoothTransition)
+		cls.commitCount += 1
+		return True
+
+
+def TryViewOrientation(args, orientation:str=None, localView = True):
+	ViewCube.Refresh()
+	camera = CameraTransaction.get()
+	eyeVector= utils.camera.viewDirection(camera)
+
+	direction, up = ViewCube.View(orientation or 'Front')
+	newEye = camera.target.copy()
+	newEye.translateBy(adsk.core.Vector3D.create(*(val*eyeVector.length for val in direction)))
+
+	camera.upVector = adsk.core.Vector3D.create(*up)
+	camera.eye = newEye
+
+	if CameraTransaction.apply(camera): utils.doEvents()
+
+
+
+
+
+
+
+
+
+
+
+#Built in commands for built in macros
+	
+#|||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+
+def reAssignCamera(cameraCopy:adsk.core.Camera=None): CameraTransaction.apply(cameraCopy, True, True)
+
+def getLineDirection(prompt):
+	try: line = ui_.selectEntity(prompt,'LinearEdges,SketchLines,ConstructionLines')
+	except: return None
+	if line: return geometry.lines.getDirection(line.entity)
+
+def viewCommandSetup(cmd: adsk.core.Command): cmd.isRepeatable=cmd.isExecutedWhenPreEmpted=False
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def alignViewHandler(args: adsk.core.CommandCreatedEventArgs):
+	viewCommandSetup(args.command)
+	lineDirection = getLineDirection('Please select a line represinting the "up" direction')
+	if not lineDirection: return reAssignCamera() #Still applies the earlier steps of the macro
+	camera_copy = CameraTransaction.get()
+	upDirection = camera_copy.upVector.copy()
+
+	orintatedVector = geometry.vectors.project(upDirection,lineDirection,True)
+
+	camera_copy.upVector = orintatedVector
+	reAssignCamera(camera_copy)
+
+
+def changeViewAxis(args: adsk.core.CommandCreatedEventArgs):
+	viewCommandSetup(args.command)
+	lineDirection = getLineDirection('Please select a line represinting the "forwards" direction')
+	if not lineDirection: return reAssignCamera() #Still applies the earlier steps of the macro
+	camera_copy = CameraTransaction.get()
+	cameraDirection = utils.camera.viewDirection(camera_copy)
+
+	if cameraDirection.isPerpendicularTo(lineDirection):#Prevents perpendicular angles from failing
+		orintatedVector = geometry.vectors.normalOf(lineDirection)
+		if camera_copy.upVector.isParallelTo(lineDirection):
+			camera_copy.upVector = geometry.vectors.normalOf(cameraDirection)
+	else: orintatedVector = geometry.vectors.project(cameraDirection,lineDirection,True)
+	orintatedVector.scaleBy(cameraDirection.length)
+
+	newEye = camera_copy.target.asVector()
+	newEye.subtract(orintatedVector)
+	camera_copy.eye = newEye.asPoint()
+	reAssignCamera(camera_copy)
@@ -0,0 +1,181 @@
+# Headless AnyMacro benchmarks, run with:  python benchmarks/bench.py [--sizes 10 1000 10000] [--output results.json]
+# Every result holds wall time plus the number of calls made into the (stub) Fusion API, so regressions in
+# startup and dispatch cost show up on any machine without Fusion 360 installed.
+import argparse, json, platform, sys, time
+
+from harness import adsk, importAddin, loadAddin, removeAddin, syntheticMacros
+
+results = []
+
+def measure(name:str, function, size:int = None, addin = None, repeat:int = 1):
+	adsk.core.CALLS.clear()
+	start = time.perf_counter()
+	for _ in range(repeat): function()
+	seconds = time.perf_counter() - start
+	result = dict(name=name, size=size, repeat=repeat, seconds=seconds, perCall=seconds/repeat, calls=dict(sorted(adsk.core.CALLS.items())))
+	if addin is not None: addin.macro_file_.drain(); result['saveWrites'] = addin.macro_file_.writeCount
+	results.append(result)
+	print(f'{name:<56}{"" if size is None else size:>8}{seconds*1000:>14.3f} ms', file=sys.stderr)
+	return result
+
+def execute(app, cmdId:str):
+	app.userInterface.commandDefinitions.itemById(cmdId).execute()
+	app.pump()
+
+#|||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+
+def benchStartup(size:int):
+	addin, app, root = loadAddin(syntheticMacros(size))
+	measure('run', lambda: addin.run(None), size, addin)
+	measure('stop', lambda: addin.stop(None), size, addin)
+	addin = importAddin(root)
+	result = measure('run_warm', lambda: addin.run(None), size, addin) #Reloaded in the same session, the definitions are still there
+	result['definitionsReused'] = addin.definition_cache_.adopted
+	addin.stop(None)
+	removeAddin(root)
+
+def benchJsonToMacros(size:int):
+	addin, app, root = loadAddin([])
+	addin.run(None)
+	addin.macro_file_.drain() #The startup save would otherwise replace the library written below
+	with open(addin.MACRO_FILE_DATA_PATH, 'w') as file: json.dump(syntheticMacros(size), file)
+	measure('jsonToMacros', addin.jsonToMacros, size, addin)
+	measure('library_load_indexed', addin.macro_file_.load, size, addin) #The first load wrote the index
+	addin.stop(None)
+	removeAddin(root)
+
+def benchReplay(repeat:int, steps:int = 10, timed:bool = False):
+	addin, app, root = loadAddin([dict(name='Replay', id='AnyMacro_Replay', executeList=[f'BenchCommand{step}' for step in range(steps)])])
+	addin.run(None)
+	addin.replay_timing_tgl.controlDefinition.isChecked = timed
+	measure('replay_timed' if timed else 'replay', lambda: execute(app, 'AnyMacro_Replay'), steps, addin, repeat)
+	addin.stop(None)
+	removeAddin(root)
+
+def benchRepeat(repeat:int, steps:int = 10):
+	addin, app, root = loadAddin([dict(name='Repeat', id='AnyMacro_Repeat', executeList=[f'BenchCommand{step}' for step in range(steps)], repeat=repeat)])
+	addin.run(None)
+	measure('replay_repeat', lambda: execute(app, 'AnyMacro_Repeat'), steps*repeat, addin)
+	addin.stop(None)
+	removeAddin(root)
+
+def benchQueue(count:int, steps:int = 10): #Back to back triggers, each run waits for the one before it
+	addin, app, root = loadAddin([dict(name='Queued', id='AnyMacro_Queued', executeList=[f'BenchCommand{step}' for step in range(steps)])])
+	addin.run(None)
+	addin.REPLAY_QUEUE_LIMIT = count
+	macro = addin.allMacros.get('AnyMacro_Queued')
+	def burst():
+		for _ in range(count): macro.replay()
+		app.pump()
+	result = measure('replay_queued', burst, count, addin)
+	result['queue'] = addin.replay_dispatcher_.queueStats()
+	addin.stop(None)
+	removeAddin(root)
+
+def benchCompose(repeat:int, depth:int = 10):
+	chain = [dict(name=f'Level {level}', id=f'AnyMacro_Level_{level}', executeList=([f'AnyMacro_Level_{level-1}'] if level else []) + [f'BenchCommand{step}' for step in range(4)]) for level in range(depth)]
+	addin, app, root = loadAddin(chain)
+	addin.run(None)
+	top = addin.allMacros.get(f'AnyMacro_Level_{depth-1}')
+	measure('compose_flatten', lambda: top.plan, depth)
+	measure('replay_composed', lambda: execute(app, top.id), len(top.plan), addin, repeat)
+	addin.stop(None)
+	removeAddin(root)
+
+def benchRecording(count:int):
+	addin, app, root = loadAddin([])
+	addin.run(None)
+	execute(app, addin.ENABLE_CMD_DEF_ID)
+	measure('record_log', lambda: [execute(app, f'BenchCommand{index%16}') for index in range(count)], count, addin)
+	measure('record_stop', lambda: execute(app, addin.ENABLE_CMD_DEF_ID), count, addin)
+	addin.stop(None)
+	removeAddin(root)
+
+def benchSearch(size:int, repeat:int):
+	addin, app, root = loadAddin(syntheticMacros(size))
+	addin.run(None)
+	addin.stop(None)
+	addin = importAddin(root) #Started from the index, like every start after the first
+	addin.run(None)
+	addin.macro_file_.drain()
+	def indexSteps(): addin.allMacros.indexUnreadSteps(); addin.macro_file_.drain()
+	result = measure('search_index_steps', indexSteps, size, addin) #What opening the palette does once
+	result['loadedMacros'] = sum(1 for macro in addin.allMacros if macro._executeList is not None)
+	for query in ('macro 12', 'synthtic 7', 'bench 3'):
+		measure(f'search:{query}', lambda: addin.allMacros.search(query), size, addin, repeat)
+	addin.stop(None)
+	removeAddin(root)
+
+def benchUpdate(size:int):
+	addin, app, root = loadAddin(syntheticMacros(size))
+	addin.run(None)
+	for page in addin.macro_menu_.pages: page.load() #Every macro has controls to patch
+	renamed = [dict(macro, name=f'Renamed Macro {index}') for index, macro in enumerate(syntheticMacros(min(size, 100)))]
+	measure('import_rename', lambda: addin.importMacros(renamed), len(renamed), addin)
+	addin.stop(None)
+	removeAddin(root)
+
+def benchMemory(size:int):
+	addin, app, root = loadAddin(syntheticMacros(size))
+	addin.run(None)
+	result = measure('memory_report', addin.memoryReport, size, addin)
+	result.update({key:value for key, value in addin.memoryReport().items() if key.endswith('Bytes')})
+	addin.stop(None)
+	removeAddin(root)
+
+def benchValidate(size:int):
+	addin, app, root = loadAddin(syntheticMacros(size))
+	addin.run(None)
+	addin.stop(None)
+	addin = importAddin(root) #Started from the index, so the sweep has to read the steps of every macro
+	addin.run(None)
+	addin.macro_file_.drain()
+	def sweep(): addin.library_validator_.sweep(); addin.macro_file_.drain()
+	result = measure('validate_sweep', sweep, size, addin)
+	result['broken'] = len(addin.library_validator_.broken)
+	addin.stop(None)
+	removeAddin(root)
+
+def benchCamera(repeat:int):
+	addin, app, root = loadAddin()
+	addin.run(None)
+	for cmdId in ('zxynine_anymacro_BuiltinAlignView', 'zxynine_anymacro_BuiltinChangeView', 'zxynine_anymacro_BuiltinChangeViewOrientation', 'AnyMacro_Builtin_Align_Camera'):
+		transaction = addin.cameraCommands().CameraTransaction
+		transaction.commitCount = 0
+		result = measure(f'camera:{cmdId}', lambda: execute(app, cmdId), None, addin, repeat)
+		result['viewportUpdates'] = app.activeViewport.refreshCount; app.activeViewport.refreshCount = 0
+		result['cameraCommits'] = transaction.commitCount
+		assert transaction.commitCount == repeat, f'{cmdId} committed the camera {transaction.commitCount} times in {repeat} runs' #Merged camera steps commit once per run
+	addin.stop(None)
+	removeAddin(root)
+
+#|||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+
+def main():
+	parser = argparse.ArgumentParser(description='Headless AnyMacro benchmarks')
+	parser.add_argument('--sizes', type=int, nargs='+', default=[10, 1000, 10000], help='Synthetic library sizes')
+	parser.add_argument('--repeat', type=int, default=200, help='Repetitions for replay and camera benchmarks')
+	parser.add_argument('--output', help='Write the JSON results here instead of stdout')
+	options = parser.parse_args()
+
+	for size in options.sizes:
+		benchStartup(size)
+		benchJsonToMacros(size)
+		benchSearch(size, options.repeat)
+		benchMemory(size)
+		benchUpdate(size)
+		benchValidate(size)
+	benchReplay(options.repeat)
+	benchReplay(options.repeat, timed=True)
+	benchRepeat(options.repeat)
+	benchQueue(options.repeat)
+	benchCompose(options.repeat)
+	benchRecording(options.repeat)
+	benchCamera(options.repeat)
+
+	report = dict(python=platform.python_version(), platform=platform.platform(), results=results)
+	if options.output:
+		with open(options.output, 'w') as file: json.dump(report, file, indent=2)
+	else: print(json.dumps(report, indent=2))
+
+if __name__ == '__main__': main()
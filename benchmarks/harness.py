@@ -0,0 +1,47 @@
+# Loads AnyMacro outside of Fusion 360 using the stand-in adsk and AddinLib modules in ./stubs.
+# The add-in is copied into a temporary package so benchmarks never touch the real save files.
+import sys, os, json, shutil, tempfile, types, importlib
+
+BENCH_DIR = os.path.dirname(os.path.realpath(__file__))
+ADDIN_DIR = os.path.dirname(BENCH_DIR)
+STUBS_DIR = os.path.join(BENCH_DIR, 'stubs')
+PACKAGE = 'AnyMacroBench'
+
+if STUBS_DIR not in sys.path: sys.path.insert(0, STUBS_DIR)
+import adsk, adsk.core
+
+
+def syntheticMacros(count:int, steps:int = 4):
+	return [dict(name=f'Synthetic Macro {index}', id=f'AnyMacro_Synthetic_{index}', executeList=[f'BenchCommand{step}' for step in range(steps)]) for index in range(count)]
+
+
+def addBenchCommands(ui:adsk.core.UserInterface, count:int = 16):
+	for step in range(count):
+		if not ui.commandDefinitions.itemById(f'BenchCommand{step}'): ui.commandDefinitions.addButtonDefinition(f'BenchCommand{step}', f'Bench Command {step}', '', '')
+
+
+def loadAddin(macros:list = None):
+	root = tempfile.mkdtemp(prefix='anymacro_bench_')
+	addinRoot = os.path.join(root, PACKAGE)
+	shutil.copytree(os.path.join(STUBS_DIR, 'AddinLib'), os.path.join(addinRoot, 'AddinLib'))
+	shutil.copytree(os.path.join(ADDIN_DIR, 'macros'), os.path.join(addinRoot, 'macros'))
+	for name in os.listdir(ADDIN_DIR):
+		if name.endswith(('.py', '.manifest')): shutil.copy2(os.path.join(ADDIN_DIR, name), addinRoot)
+	if macros is not None:
+		with open(os.path.join(addinRoot, 'macros', 'SavedMacros.json'), 'w') as file: json.dump(macros, file)
+
+	adsk.core.Application.reset()
+	addin = importAddin(addinRoot)
+	app = adsk.core.Application.get()
+	addBenchCommands(app.userInterface)
+	return addin, app, addinRoot
+
+
+def importAddin(addinRoot:str): #Without resetting the application, this is what reloading the add-in inside Fusion looks like
+	for name in [name for name in sys.modules if name == PACKAGE or name.startswith(f'{PACKAGE}.')]: del sys.modules[name]
+	package = types.ModuleType(PACKAGE); package.__path__ = [addinRoot]
+	sys.modules[PACKAGE] = package
+	return importlib.import_module(f'{PACKAGE}.AnyMacro')
+
+
+def removeAddin(addinRoot:str): shutil.rmtree(os.path.dirname(addinRoot), ignore_errors=True)
@@ -0,0 +1,4 @@
+import adsk.core
+def GetAppUI():
+	app = adsk.core.Application.get()
+	return app, app.userInterface
@@ -0,0 +1 @@
+# Stand-ins for the AddinLib submodule used by AnyMacro.
@@ -0,0 +1,16 @@
+import functools, traceback
+class ErrorCatcher:
+	def __init__(self, reraise=True): self.reraise = reraise; self.errors = []
+	def __call__(self, function):
+		@functools.wraps(function)
+		def wrapper(*args, **kwargs):
+			try: return function(*args, **kwargs)
+			except Exception:
+				self.errors.append(traceback.format_exc())
+				if self.reraise: raise
+		return wrapper
+	def __enter__(self): return self
+	def __exit__(self, excType, exc, tb):
+		if exc is None: return False
+		self.errors.append(''.join(traceback.format_exception(excType, exc, tb)))
+		return not self.reraise
@@ -0,0 +1,20 @@
+import adsk.core
+class LinkedHandler(adsk.core.EventHandler):
+	def __init__(self, manager, event, callback):
+		self.manager, self.event, self.callback = manager, event, callback
+		event.add(self)
+	def notify(self, args):
+		with self.manager.error_catcher: self.callback(args)
+	def remove(self):
+		self.event.remove(self)
+		if self in self.manager.handlers: self.manager.handlers.remove(self)
+
+class EventsManager:
+	def __init__(self, error_catcher):
+		self.error_catcher = error_catcher; self.handlers = []
+	def add_handler(self, event, callback):
+		handler = LinkedHandler(self, event, callback)
+		self.handlers.append(handler)
+		return handler
+	def clean_up(self, oldControl=None):
+		for handler in list(self.handlers): handler.remove()
@@ -0,0 +1,14 @@
+import adsk.core
+class lines:
+	@staticmethod
+	def getDirection(line): return adsk.core.Vector3D.create(0, 0.6, 0.8) #Every selected line points the same way
+class vectors:
+	@staticmethod
+	def project(vector, onto, normalize=False):
+		result = onto.copy(); result.scaleBy(vector.dotProduct(onto) / (onto.length ** 2 or 1))
+		if normalize: result.normalize()
+		return result
+	@staticmethod
+	def normalOf(vector):
+		other = adsk.core.Vector3D.create(1, 0, 0) if abs(vector.x) < 0.9 else adsk.core.Vector3D.create(0, 1, 0)
+		result = vector.crossProduct(other); result.normalize(); return result
@@ -0,0 +1 @@
+def getVersion(): return '0.0.0-stub'
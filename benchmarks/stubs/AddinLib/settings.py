@@ -0,0 +1,11 @@
+import json, os
+def readDataFromFile(filePath, asJson=True):
+	if not os.path.exists(filePath): return [] if asJson else ''
+	with open(filePath, 'r', encoding='utf-8') as file: data = file.read()
+	return json.loads(data) if asJson else data
+def writeDataToFile(filePath, data, asJson=True):
+	with open(filePath, 'w', encoding='utf-8') as file: file.write(json.dumps(data, indent=2) if asJson else data)
+def fromJson(jsonObject, methods):
+	data = json.loads(jsonObject) if isinstance(jsonObject, str) else jsonObject
+	method = methods.get(type(data))
+	return lambda _: method(data)
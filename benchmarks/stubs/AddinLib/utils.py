@@ -0,0 +1,32 @@
+import importlib, adsk, adsk.core
+def ifDelete(obj):
+	if obj is not None and obj.isValid: return obj.deleteMe()
+	return False
+def executeCommand(cmdId):
+	cmdDef = adsk.core.Application.get().userInterface.commandDefinitions.itemById(cmdId)
+	return cmdDef.execute() if cmdDef else False
+def toIdentifier(name): return ''.join(c if c.isidentifier() or c.isdigit() else '_' for c in name)
+def MessagePromptCast(message, title=''):
+	ui = adsk.core.Application.get().userInterface
+	return ui.messageBox(message, title, adsk.core.MessageBoxButtonTypes.OKCancelButtonType) == adsk.core.DialogResults.DialogOK
+def doEvents(): return adsk.doEvents()
+def ReImport_List(*modules):
+	for module in modules: importlib.reload(module)
+class CustomEvents:
+	@staticmethod
+	def Create(eventId):
+		app = adsk.core.Application.get()
+		app.unregisterCustomEvent(eventId)
+		return app.registerCustomEvent(eventId)
+	@staticmethod
+	def Remove(eventId): return adsk.core.Application.get().unregisterCustomEvent(eventId)
+class camera:
+	@staticmethod
+	def get(): return adsk.core.Application.get().activeViewport.camera
+	@staticmethod
+	def viewDirection(cam): return cam.eye.vectorTo(cam.target)
+	@staticmethod
+	def updateCamera(cam, smooth=False):
+		cam.isSmoothTransition = smooth
+		adsk.core.Application.get().activeViewport.camera = cam
+		return True
@@ -0,0 +1,6 @@
+# Minimal stand-in for the Fusion 360 adsk package.
+def doEvents():
+	from . import core
+	core.Application.get().pump()
+	return True
+def autoTerminate(value): return True
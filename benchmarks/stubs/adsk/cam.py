@@ -0,0 +1 @@
+# Minimal stand-in for adsk.cam; AnyMacro only needs the module to exist.
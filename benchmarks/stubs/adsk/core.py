@@ -0,0 +1,364 @@
+# Minimal stand-in for the Fusion 360 adsk.core module, just enough for AnyMacro to run headless.
+import math
+from collections import deque
+
+CALLS = {}
+def _count(name): CALLS[name] = CALLS.get(name, 0) + 1
+
+
+class Base:
+	isValid = True
+	def deleteMe(self):
+		_count(f'{type(self).__name__}.deleteMe')
+		self.isValid = False
+		owner = getattr(self, '_owner', None)
+		if owner is not None: owner._forget(self)
+		return True
+
+
+class Event:
+	def __init__(self, name=''): self.name = name; self.handlers = []
+	def add(self, handler): _count('Event.add'); self.handlers.append(handler); return True
+	def remove(self, handler):
+		_count('Event.remove')
+		try: self.handlers.remove(handler); return True
+		except ValueError: return False
+	def fire(self, args):
+		for handler in list(self.handlers): handler.notify(args)
+
+class EventHandler:
+	def notify(self, args): pass
+class CommandCreatedEventHandler(EventHandler): pass
+class CommandEventHandler(EventHandler): pass
+class ApplicationCommandEventHandler(EventHandler): pass
+class CustomEventHandler(EventHandler): pass
+class InputChangedEventHandler(EventHandler): pass
+
+class CommandCreatedEvent(Event): pass
+class CommandEvent(Event): pass
+class ApplicationCommandEvent(Event): pass
+class CustomEvent(Event): pass
+class InputChangedEvent(Event): pass
+
+
+class EventArgs:
+	def __init__(self, **kwargs): self.__dict__.update(kwargs)
+class CommandCreatedEventArgs(EventArgs): pass
+class CommandEventArgs(EventArgs): pass
+class ApplicationCommandEventArgs(EventArgs): pass
+class CustomEventArgs(EventArgs): pass
+class InputChangedEventArgs(EventArgs): pass
+
+
+class DefaultModelingOrientations:
+	YUpModelingOrientation = 0
+	ZUpModelingOrientation = 1
+
+class DropDownStyles:
+	TextListDropDownStyle = 1
+	LabeledIconDropDownStyle = 2
+
+class DialogResults:
+	DialogOK = 0
+	DialogCancel = 1
+	DialogYes = 2
+	DialogNo = 3
+
+class MessageBoxButtonTypes:
+	OKButtonType = 0
+	OKCancelButtonType = 1
+	YesNoButtonType = 3
+
+class MessageBoxIconTypes:
+	NoIconIconType = 0
+	QuestionIconType = 1
+	InformationIconType = 2
+	WarningIconType = 3
+	CriticalIconType = 4
+
+
+#|||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+# Geometry
+
+class Vector3D:
+	def __init__(self, x=0.0, y=0.0, z=0.0): self.x, self.y, self.z = float(x), float(y), float(z)
+	@staticmethod
+	def create(x=0.0, y=0.0, z=0.0): _count('Vector3D.create'); return Vector3D(x, y, z)
+	@property
+	def length(self): return math.sqrt(self.x*self.x + self.y*self.y + self.z*self.z)
+	def copy(self): return Vector3D(self.x, self.y, self.z)
+	def add(self, other): self.x += other.x; self.y += other.y; self.z += other.z; return True
+	def subtract(self, other): self.x -= other.x; self.y -= other.y; self.z -= other.z; return True
+	def scaleBy(self, scale): self.x *= scale; self.y *= scale; self.z *= scale; return True
+	def normalize(self):
+		length = self.length
+		if length == 0: return False
+		self.scaleBy(1/length); return True
+	def dotProduct(self, other): return self.x*other.x + self.y*other.y + self.z*other.z
+	def crossProduct(self, other):
+		return Vector3D(self.y*other.z - self.z*other.y, self.z*other.x - self.x*other.z, self.x*other.y - self.y*other.x)
+	def isParallelTo(self, other): return self.crossProduct(other).length < 1e-9
+	def isPerpendicularTo(self, other): return abs(self.dotProduct(other)) < 1e-9
+	def isEqualTo(self, other): return (self.x, self.y, self.z) == (other.x, other.y, other.z)
+	def asArray(self): return (self.x, self.y, self.z)
+	def asPoint(self): return Point3D(self.x, self.y, self.z)
+
+class Point3D:
+	def __init__(self, x=0.0, y=0.0, z=0.0): self.x, self.y, self.z = float(x), float(y), float(z)
+	@staticmethod
+	def create(x=0.0, y=0.0, z=0.0): return Point3D(x, y, z)
+	def copy(self): return Point3D(self.x, self.y, self.z)
+	def asVector(self): return Vector3D(self.x, self.y, self.z)
+	def asArray(self): return (self.x, self.y, self.z)
+	def translateBy(self, vector): self.x += vector.x; self.y += vector.y; self.z += vector.z; return True
+	def vectorTo(self, other): return Vector3D(other.x - self.x, other.y - self.y, other.z - self.z)
+
+class Camera:
+	def __init__(self):
+		self.eye = Point3D(0, 0, 10)
+		self.target = Point3D(0, 0, 0)
+		self.upVector = Vector3D(0, 1, 0)
+		self.isSmoothTransition = False
+	def copy(self):
+		camera = Camera()
+		camera.eye, camera.target, camera.upVector = self.eye.copy(), self.target.copy(), self.upVector.copy()
+		return camera
+
+class Viewport:
+	def __init__(self): self._camera = Camera(); self.refreshCount = 0
+	@property
+	def camera(self): _count('Viewport.camera.get'); return self._camera.copy()
+	@camera.setter
+	def camera(self, value): _count('Viewport.camera.set'); self._camera = value.copy(); self.refreshCount += 1
+	def refresh(self): self.refreshCount += 1
+
+
+#|||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
+# Commands and controls
+
+class Collection(Base):
+	def __init__(self): self._items = {}
+	def itemById(self, itemId): _count(f'{type(self).__name__}.itemById'); return self._items.get(itemId)
+	@property
+	def count(self): return len(self._items)
+	def item(self, index): return list(self._items.values())[index]
+	def __iter__(self): return iter(list(self._items.values()))
+	def _adopt(self, item):
+		old = self._items.get(item.id)
+		if old is not None: raise RuntimeError(f'Duplicate id: {item.id}')
+		item._owner = self; self._items[item.id] = item
+		return item
+	def _forget(self, item):
+		if self._items.get(item.id) is item: del self._items[item.id]
+
+
+class ControlDefinition:
+	def __init__(self, name): self.name = name; self.isEnabled = self.isVisible = True
+class CheckBoxControlDefinition(ControlDefinition):
+	def __init__(self, name, isChecked): super().__init__(name); self.isChecked = isChecked
+
+
+class Command:
+	def __init__(self, definition):
+		self.parentCommandDefinition = definition
+		self.execute = CommandEvent('execute')
+		self.destroy = CommandEvent('destroy')
+		self.inputChanged = InputChangedEvent('inputChanged')
+		self.commandInputs = CommandInputs()
+		self.isRepeatable = self.isExecutedWhenPreEmpted = True
+		self.okButtonText = 'OK'
+		self.isAutoExecute = False
+
+class CommandDefinition(Base):
+	def __init__(self, cmdId, name, tooltip, resourceFolder, controlDefinition=None):
+		_count('CommandDefinitions.add')
+		self.id, self.tooltip, self.resourceFolder = cmdId, tooltip, resourceFolder
+		self.controlDefinition = controlDefinition or ControlDefinition(name)
+		self.commandCreated = CommandCreatedEvent(f'{cmdId}.commandCreated')
+	@property
+	def name(self): return self.controlDefinition.name
+	def execute(self, input=None):
+		_count('CommandDefinition.execute')
+		app = Application.get()
+		app._pending.append(self)
+		return True
+
+class CommandDefinitions(Collection):
+	def addButtonDefinition(self, cmdId, name, tooltip, resourceFolder=''):
+		return self._adopt(CommandDefinition(cmdId, name, tooltip, resourceFolder))
+	def addCheckBoxDefinition(self, cmdId, name, tooltip, isChecked):
+		return self._adopt(CommandDefinition(cmdId, name, tooltip, '', CheckBoxControlDefinition(name, isChecked)))
+
+
+class ToolbarControl(Base):
+	def __init__(self, itemId):
+		_count('ToolbarControls.add')
+		self.id = itemId; self.isVisible = True; self.isPromoted = self.isPromotedByDefault = False
+	@property
+	def parent(self): return getattr(self, '_owner', None)
+
+class CommandControl(ToolbarControl):
+	def __init__(self, commandDefinition):
+		super().__init__(commandDefinition.id); self.commandDefinition = commandDefinition
+
+class SeparatorControl(ToolbarControl): pass
+
+class DropDownControl(ToolbarControl):
+	def __init__(self, name, resourceFolder, itemId):
+		super().__init__(itemId); self.name = name; self.resourceFolder = resourceFolder; self.controls = ToolbarControls()
+	def deleteMe(self):
+		for control in list(self.controls): control.deleteMe()
+		return super().deleteMe()
+
+class ToolbarControls(Collection):
+	def addCommand(self, commandDefinition, positionID='', isBefore=True):
+		return self._adopt(CommandControl(commandDefinition))
+	def addDropDown(self, text, resourceFolder, itemId='', positionID='', isBefore=True):
+		return self._adopt(DropDownControl(text, resourceFolder, itemId))
+	def addSeparator(self, itemId='', positionID='', isBefore=True):
+		return self._adopt(SeparatorControl(itemId))
+
+
+class ToolbarPanel(Base):
+	def __init__(self, panelId, name=''): self.id = panelId; self.name = name; self.controls = ToolbarControls()
+	def deleteMe(self):
+		for control in list(self.controls): control.deleteMe()
+		return super().deleteMe()
+
+class ToolbarPanels(Collection):
+	def add(self, panelId, name, positionID='', isBefore=True): return self._adopt(ToolbarPanel(panelId, name))
+
+class ToolbarTab(Base):
+	def __init__(self, tabId): self.id = tabId; self.toolbarPanels = ToolbarPanels()
+
+class ToolbarTabs(Collection):
+	def add(self, tabId): return self._adopt(ToolbarTab(tabId))
+
+
+class ListItem:
+	def __init__(self, name, isSelected, index=0): self.name = name; self.isSelected = isSelected; self.index = index
+class ListItems(list):
+	def add(self, name, isSelected=False, icon=''): item = ListItem(name, isSelected, len(self)); self.append(item); return item
+	def clear(self): del self[:]; return True
+	@property
+	def count(self): return len(self)
+	def item(self, index): return self[index]
+
+class CommandInput:
+	def __init__(self, inputId, name): self.id = inputId; self.name = name; self.isVisible = True
+class StringValueCommandInput(CommandInput):
+	def __init__(self, inputId, name, value): super().__init__(inputId, name); self.value = value
+class DropDownCommandInput(CommandInput):
+	def __init__(self, inputId, name, style):
+		super().__init__(inputId, name); self.listItems = ListItems()
+	@property
+	def selectedItem(self): return next((item for item in self.listItems if item.isSelected), None)
+class TextBoxCommandInput(CommandInput):
+	def __init__(self, inputId, name, text, numRows, isReadOnly): super().__init__(inputId, name); self.text = text
+class IntegerSpinnerCommandInput(CommandInput):
+	def __init__(self, inputId, name, minimum, maximum, step, value): super().__init__(inputId, name); self.value = value
+
+class CommandInputs(list):
+	def itemById(self, inputId): return next((item for item in self if item.id == inputId), None)
+	def _add(self, item): self.append(item); return item
+	def addStringValueInput(self, inputId, name, value=''): return self._add(StringValueCommandInput(inputId, name, value))
+	def addDropDownCommandInput(self, inputId, name, style): return self._add(DropDownCommandInput(inputId, name, style))
+	def addTextBoxCommandInput(self, inputId, name, text, numRows, isReadOnly): return self._add(TextBoxCommandInput(inputId, name, text, numRows, isReadOnly))
+	def addIntegerSpinnerCommandInput(self, inputId, name, minimum, maximum, step, value): return self._add(IntegerSpinnerCommandInput(inputId, name, minimum, maximum, step, value))
+
+
+class Selection:
+	def __init__(self, entity): self.entity = entity
+
+class Selections(list):
+	def clear(self): _count('Selections.clear'); del self[:]; return True
+
+
+class FileDialog:
+	def __init__(self, answers:deque): self.answers = answers; self.title = self.filter = self.filename = ''
+	def showOpen(self):
+		if not self.answers: return DialogResults.DialogCancel
+		self.filename = self.answers.popleft()
+		return DialogResults.DialogOK
+
+
+class UserInterface:
+	def __init__(self):
+		self.commandDefinitions = CommandDefinitions()
+		self.allToolbarTabs = ToolbarTabs()
+		self.allToolbarPanels = ToolbarPanels()
+		self.commandStarting = ApplicationCommandEvent('commandStarting')
+		self.commandTerminated = ApplicationCommandEvent('commandTerminated')
+		self.activeSelections = Selections()
+		self.inputBoxAnswers = deque()
+		self.messageBoxAnswers = deque()
+		self.fileDialogAnswers = deque()
+		self.messages = []
+		self.allToolbarTabs.add('ToolsTab')
+		self.allToolbarPanels.add('ToolsInspectPanel', 'Inspect')
+	def inputBox(self, prompt, title='', defaultValue=''):
+		if self.inputBoxAnswers: return self.inputBoxAnswers.popleft(), False
+		return defaultValue, True
+	def messageBox(self, text, title='', buttons=0, icon=0):
+		self.messages.append(text)
+		if self.messageBoxAnswers: return self.messageBoxAnswers.popleft()
+		return DialogResults.DialogOK
+	def selectEntity(self, prompt, filter): return Selection(Base())
+	def createFileDialog(self): return FileDialog(self.fileDialogAnswers)
+
+
+class GeneralPreferences:
+	def __init__(self): self.defaultModelingOrientation = DefaultModelingOrientations.YUpModelingOrientation
+class Preferences:
+	def __init__(self): self.generalPreferences = GeneralPreferences()
+
+
+class Application:
+	_instance = None
+	def __init__(self):
+		self.userInterface = UserInterface()
+		self.preferences = Preferences()
+		self.activeViewport = Viewport()
+		self.customEvents = {}
+		self.logs = []
+		self._pending = deque()
+		self._events = deque() #Custom events fired from any thread, delivered by pump on the calling (UI) thread
+	@staticmethod
+	def get():
+		if Application._instance is None: Application._instance = Application()
+		return Application._instance
+	@staticmethod
+	def reset(): Application._instance = None; CALLS.clear()
+
+	def registerCustomEvent(self, eventId):
+		event = self.customEvents[eventId] = CustomEvent(eventId); return event
+	def unregisterCustomEvent(self, eventId): return self.customEvents.pop(eventId, None) is not None
+	def fireCustomEvent(self, eventId, additionalInfo=''): #Like Fusion, only queued, the handlers run later on the UI thread
+		if eventId not in self.customEvents: return False
+		self._events.append((eventId, additionalInfo)); return True
+	def log(self, message, level=0, type=0): self.logs.append(message)
+
+	def deliverEvents(self):
+		while self._events:
+			eventId, additionalInfo = self._events.popleft()
+			event = self.customEvents.get(eventId)
+			if event is not None: event.fire(CustomEventArgs(id=eventId, additionalInfo=additionalInfo))
+
+	# Runs queued custom events and command executions the way Fusion would: starting -> created -> (execute) -> terminated.
+	def pump(self, limit=1_000_000):
+		ui = self.userInterface
+		self.deliverEvents()
+		while self._pending and limit:
+			limit -= 1
+			definition = self._pending.popleft()
+			if not definition.isValid: continue
+			startArgs = ApplicationCommandEventArgs(commandId=definition.id, commandDefinition=definition, isCanceled=False)
+			ui.commandStarting.fire(startArgs)
+			if startArgs.isCanceled: continue
+			command = Command(definition)
+			definition.commandCreated.fire(CommandCreatedEventArgs(command=command, firingEvent=definition.commandCreated))
+			command.execute.fire(CommandEventArgs(command=command, firingEvent=command.execute))
+			command.destroy.fire(CommandEventArgs(command=command, firingEvent=command.destroy))
+			ui.commandTerminated.fire(ApplicationCommandEventArgs(commandId=definition.id, commandDefinition=definition, terminationReason=0))
+			self.deliverEvents()
+		return not self._pending
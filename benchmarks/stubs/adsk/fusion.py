@@ -0,0 +1,2 @@
+# Minimal stand-in for adsk.fusion; AnyMacro only needs the module to exist.
+class Design: pass